@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.session_models import (
     SessionCreateRequest, SessionCreateResponse, SessionConfig,
     TeacherSessionsResponse, SessionDetailsResponse, SessionJoinRequest,
     SessionJoinResponse, QRCodeInfo, SessionInfo
 )
 from app.models.request_models import SessionChatRequest, SessionChatResponse
+from app.core.database import get_db
 from app.services.session_service import get_session_service
 from app.services.qr_service import get_qr_service
 from app.services.socratic_service import SocraticService
@@ -81,18 +83,6 @@ async def get_teacher_sessions(request: Request):
         # Get sessions
         sessions = await session_service.get_teacher_sessions(teacher_fingerprint)
 
-        # Convert datetime objects to ISO strings with timezone info
-        for session in sessions:
-            for field in ['created_at', 'expires_at', 'last_activity', 'ended_at']:
-                if field in session and hasattr(session[field], 'isoformat'):
-                    session[field] = session[field].isoformat()
-
-            # Also convert datetime objects in live_stats if any
-            if 'live_stats' in session and 'recent_activities' in session['live_stats']:
-                for activity in session['live_stats']['recent_activities']:
-                    if 'timestamp' in activity and hasattr(activity['timestamp'], 'isoformat'):
-                        activity['timestamp'] = activity['timestamp'].isoformat()
-
         # Calculate summary stats
         total_sessions = len(sessions)
         total_students = sum(s.get('live_stats', {}).get('total_joined', 0) for s in sessions)
@@ -139,33 +129,19 @@ async def get_session_details(session_id: str, request: Request):
         session_data = session_details['session']
         students = session_details['students']
 
-        # Convert datetime objects to ISO strings with timezone info
-        for field in ['created_at', 'expires_at', 'last_activity', 'ended_at']:
-            if field in session_data and hasattr(session_data[field], 'isoformat'):
-                session_data[field] = session_data[field].isoformat()
-
-        # Convert datetime objects in students
-        for student in students:
-            for field in ['last_activity', 'joined_at']:
-                if field in student and hasattr(student[field], 'isoformat'):
-                    student[field] = student[field].isoformat()
-
-        # Prepare response
-        session_info = SessionInfo(
-            id=session_data['id'],
-            config=SessionConfig(**session_data['config']),
-            status=session_data['status'],
-            created_at=session_data['created_at'],
-            expires_at=session_data['expires_at']
-        )
-
-        live_stats = session_data['live_stats']
-
-        return SessionDetailsResponse(
-            session=session_info,
-            live_stats=live_stats,
-            students=students
-        )
+        # Prepare response. FastAPI validates it against response_model once; building the
+        # models here as well would validate (and dump) the whole student list twice.
+        return {
+            'session': {
+                'id': session_data['id'],
+                'config': session_data['config'],
+                'status': session_data['status'],
+                'created_at': session_data['created_at'],
+                'expires_at': session_data['expires_at']
+            },
+            'live_stats': session_data['live_stats'],
+            'students': students
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -226,7 +202,7 @@ async def get_session_info(session_id: str):
         if not db_session:
             raise HTTPException(status_code=404, detail="Session not found")
 
-        config = SessionConfig(
+        config = SessionConfig.model_construct(  # trusted: built from our own DB row, skip validation
             title=db_session.title,
             topic=db_session.topic,
             description=db_session.description,
@@ -297,7 +273,7 @@ async def join_session(session_id: str, request: SessionJoinRequest, http_reques
         # Get current score for returning students
         current_score = join_result.get('current_score', 0)
 
-        return SessionJoinResponse(
+        join_response = SessionJoinResponse(
             success=True,
             student_id=student_id,
             student_token=join_result['student_token'],
@@ -305,6 +281,8 @@ async def join_session(session_id: str, request: SessionJoinRequest, http_reques
             initial_message=initial_message,
             understanding_score=current_score
         )
+        # Serialize straight to JSON; response_model would dump, re-validate and encode again
+        return Response(content=join_response.model_dump_json(), media_type="application/json")
 
     except HTTPException:
         raise
@@ -360,7 +338,7 @@ async def session_chat(session_id: str, request: SessionChatRequest):
             raise HTTPException(status_code=403, detail="Student not authorized for this session")
 
         # Get session configuration
-        config = SessionConfig(
+        config = SessionConfig.model_construct(  # trusted: built from our own DB row, skip validation
             title=db_session.title,
             topic=db_session.topic,
             description=db_session.description,
@@ -487,7 +465,7 @@ async def session_chat(session_id: str, request: SessionChatRequest):
         except Exception as e:
             print(f"Warning: Could not update student progress: {e}")
 
-        return SessionChatResponse(
+        chat_response = SessionChatResponse(
             socratic_response=socratic_response,
             understanding_score=understanding_score,
             is_completed=is_completed,
@@ -496,6 +474,8 @@ async def session_chat(session_id: str, request: SessionChatRequest):
             growth_indicators=evaluation_result["growth_indicators"],
             next_focus=evaluation_result["next_focus"]
         )
+        # Serialize straight to JSON; response_model would dump, re-validate and encode again
+        return Response(content=chat_response.model_dump_json(), media_type="application/json")
 
     except HTTPException:
         raise
@@ -653,25 +633,26 @@ async def get_student_scores(session_id: str, student_id: str, request: Request)
 
 
 @router.get("/session/{session_id}/history/{student_id}")
-async def get_student_chat_history(session_id: str, student_id: str):
+async def get_student_chat_history(session_id: str, student_id: str, db: AsyncSession = Depends(get_db)):
     """Get chat history for a specific student (public endpoint for student access)"""
     try:
         session_service = get_session_service()
         storage_service = get_storage_service()
 
+        # The three reads below share one request-scoped database session
         # Verify session exists in database
-        db_session = await storage_service.get_session_by_id(session_id)
+        db_session = await storage_service.get_session_by_id(session_id, db_session=db)
         if not db_session:
             raise HTTPException(status_code=404, detail="Session not found")
 
         # Verify student is part of this session
-        db_student = await storage_service.get_student_by_id(student_id)
+        db_student = await storage_service.get_student_by_id(student_id, db_session=db)
         if not db_student or db_student.session_id != session_id:
             raise HTTPException(status_code=403, detail="Student not authorized for this session")
 
         # Get chat history from database
         try:
-            messages = await storage_service.get_student_messages(session_id, student_id)
+            messages = await storage_service.get_student_messages(session_id, student_id, db_session=db)
             return {"messages": messages}
         except Exception as e:
             print(f"Warning: Could not load message history: {e}")
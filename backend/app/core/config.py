@@ -7,6 +7,14 @@ from functools import lru_cache
 from typing import List
 
 
+def _async_database_url(url: str) -> str:
+    """Point bare PostgreSQL URLs (e.g. Railway's) at the asyncpg driver."""
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
 class Settings:
     """Runtime configuration sourced from environment variables."""
 
@@ -15,7 +23,9 @@ class Settings:
         self.openai_model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         self._allowed_origins_raw = os.getenv("ALLOWED_ORIGINS", "*")
         self.static_root: str | None = os.getenv("STATIC_ROOT")
-        self.database_url: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./socratic.db")
+        self.database_url: str = _async_database_url(
+            os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./socratic.db")
+        )
         self.frontend_url: str = os.getenv("FRONTEND_URL", "https://socratic-nine.vercel.app")
 
         # PDF 처리 설정 (파일 크기는 10MB로 완화)
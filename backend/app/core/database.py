@@ -1,11 +1,18 @@
 """Database connection and session management."""
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import get_settings
 
 settings = get_settings()
 
+
+def _json_serializer(value) -> str:
+    """Serialize JSON columns with orjson (the drivers expect str, not bytes)."""
+    return orjson.dumps(value).decode()
+
+
 # Create async engine with database-specific settings
 if settings.database_url.startswith("sqlite"):
     # SQLite configuration
@@ -13,6 +20,8 @@ if settings.database_url.startswith("sqlite"):
         settings.database_url,
         echo=False,  # Set to True for SQL debugging
         future=True,
+        json_serializer=_json_serializer,
+        json_deserializer=orjson.loads,
     )
 else:
     # PostgreSQL configuration
@@ -20,10 +29,13 @@ else:
         settings.database_url,
         echo=False,  # Set to True for SQL debugging
         future=True,
+        json_serializer=_json_serializer,
+        json_deserializer=orjson.loads,
         pool_pre_ping=True,
         pool_recycle=300,  # Recycle connections every 5 minutes
         pool_size=10,
         max_overflow=20,
+        pool_use_lifo=True,  # Reuse the most recent connection so idle overflow connections can expire
         # PostgreSQL specific settings for transaction isolation
         connect_args={
             "server_settings": {
@@ -1,8 +1,22 @@
 """Database migration utilities."""
 
+import asyncio
+import logging
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Serializes concurrent startup tasks; migrations only need to run once per process
+_lock = asyncio.Lock()
+_done = False
+
+
+def _new_session() -> AsyncSession:
+    """Open a session, importing the engine lazily on first use."""
+    from app.core.database import AsyncSessionLocal
+    return AsyncSessionLocal()
 
 
 async def _detect_database_type(session: AsyncSession) -> str:
@@ -16,9 +30,73 @@ async def _detect_database_type(session: AsyncSession) -> str:
         return "sqlite"
 
 
+async def _load_schema_snapshot(session: AsyncSession) -> tuple[set, dict, set]:
+    """Return (tables, {(table, column): data type}, index names) in as few queries as possible."""
+    db_type = await _detect_database_type(session)
+
+    if db_type == "postgresql":
+        columns_query = text("""
+            SELECT table_name, column_name, data_type FROM information_schema.columns
+            WHERE table_schema = 'public';
+        """)
+        indexes_query = text("SELECT indexname FROM pg_indexes WHERE schemaname = 'public';")
+    else:
+        columns_query = text("""
+            SELECT m.name, p.name, p.type FROM sqlite_master m
+            JOIN pragma_table_info(m.name) p
+            WHERE m.type = 'table';
+        """)
+        indexes_query = text("SELECT name FROM sqlite_master WHERE type = 'index';")
+
+    columns = {(row[0], row[1]): row[2] for row in (await session.execute(columns_query)).fetchall()}
+    tables = {table for table, _ in columns}
+    indexes = {row[0] for row in (await session.execute(indexes_query)).fetchall()}
+    return tables, columns, indexes
+
+
+def _pending_migrations(tables: set, columns: dict, indexes: set) -> dict:
+    """Decide which migration steps still have work to do for the given schema snapshot."""
+    from app.migrations.add_listing_indexes import LISTING_INDEXES, REDUNDANT_INDEXES
+    from app.migrations.convert_ids_to_uuid import UUID_COLUMNS
+    from app.migrations.convert_json_to_jsonb import JSONB_COLUMNS
+
+    topic_columns = (
+        "topic_type", "topic_source", "pdf_noun_topic", "pdf_sentence_topic", "pdf_summary_topic",
+        "pdf_original_content", "manual_topic_content", "final_topic_content", "topic_metadata",
+    )
+    legacy_message_columns = ("content", "message_type", "extra_data")
+
+    return {
+        "drop_session_activities": "session_activities" in tables,
+        "drop_score_records": "score_records" in tables,
+        "drop_scores": "scores" in tables,
+        "add_deleted_at": "sessions" in tables and ("sessions", "deleted_at") not in columns,
+        "add_student_token": "students" in tables and ("students", "token") not in columns,
+        "topic_tracking": "sessions" in tables and (
+            any(("sessions", column) not in columns for column in topic_columns)
+            or not {"idx_sessions_topic_type", "idx_sessions_topic_source"} <= indexes
+        ),
+        "messages_to_json": "messages" in tables and (
+            any(("messages", column) in columns for column in legacy_message_columns)
+            or ("messages", "conversation_data") not in columns
+            or "idx_messages_student_id_unique" not in indexes
+        ),
+        # Lowercase 'json' is PostgreSQL's information_schema spelling; SQLite reports 'JSON'
+        "json_to_jsonb": any(columns.get(key) == "json" for key in JSONB_COLUMNS),
+        # PostgreSQL only: SQLite cannot add a STORED generated column to an existing table
+        "add_turn_count": columns.get(("messages", "conversation_data")) in ("json", "jsonb")
+        and ("messages", "turn_count") not in columns,
+        # 'character varying' is PostgreSQL's spelling; SQLite keeps UUIDs as VARCHAR(36) text
+        "ids_to_uuid": any(columns.get(key) == "character varying" for key in UUID_COLUMNS),
+        "listing_indexes": {"students", "messages"} <= tables and (
+            not set(LISTING_INDEXES) <= indexes or bool(indexes & set(REDUNDANT_INDEXES))
+        ),
+    }
+
+
 async def drop_session_activities_table():
     """Drop the session_activities table if it exists."""
-    async with AsyncSessionLocal() as session:
+    async with _new_session() as session:
         try:
             db_type = await _detect_database_type(session)
 
@@ -46,19 +124,19 @@ async def drop_session_activities_table():
 
                 await session.execute(drop_query)
                 await session.commit()
-                print("✅ session_activities table dropped successfully")
+                logger.info("✅ session_activities table dropped successfully")
             else:
-                print("ℹ️ session_activities table does not exist")
+                logger.info("ℹ️ session_activities table does not exist")
 
         except Exception as e:
             await session.rollback()
-            print(f"❌ Error dropping session_activities table: {e}")
+            logger.error("❌ Error dropping session_activities table", exc_info=True)
             raise
 
 
 async def add_deleted_at_column():
     """Add deleted_at column to sessions table if it doesn't exist."""
-    async with AsyncSessionLocal() as session:
+    async with _new_session() as session:
         try:
             db_type = await _detect_database_type(session)
 
@@ -78,7 +156,7 @@ async def add_deleted_at_column():
             table_exists = table_result.fetchone() is not None
 
             if not table_exists:
-                print("ℹ️ sessions table does not exist yet, skipping column addition")
+                logger.info("ℹ️ sessions table does not exist yet, skipping column addition")
                 return
 
             # Check if column exists
@@ -103,19 +181,19 @@ async def add_deleted_at_column():
 
                 await session.execute(add_column_query)
                 await session.commit()
-                print("✅ deleted_at column added to sessions table")
+                logger.info("✅ deleted_at column added to sessions table")
             else:
-                print("ℹ️ deleted_at column already exists in sessions table")
+                logger.info("ℹ️ deleted_at column already exists in sessions table")
 
         except Exception as e:
             await session.rollback()
-            print(f"❌ Error adding deleted_at column: {e}")
+            logger.error("❌ Error adding deleted_at column", exc_info=True)
             raise
 
 
 async def drop_score_records_table():
     """Drop the score_records table if it exists."""
-    async with AsyncSessionLocal() as session:
+    async with _new_session() as session:
         try:
             db_type = await _detect_database_type(session)
 
@@ -143,19 +221,19 @@ async def drop_score_records_table():
 
                 await session.execute(drop_query)
                 await session.commit()
-                print("✅ score_records table dropped successfully")
+                logger.info("✅ score_records table dropped successfully")
             else:
-                print("ℹ️ score_records table does not exist")
+                logger.info("ℹ️ score_records table does not exist")
 
         except Exception as e:
             await session.rollback()
-            print(f"❌ Error dropping score_records table: {e}")
+            logger.error("❌ Error dropping score_records table", exc_info=True)
             raise
 
 
 async def create_scores_table():
     """Create the scores table for tracking student response evaluations."""
-    async with AsyncSessionLocal() as session:
+    async with _new_session() as session:
         try:
             db_type = await _detect_database_type(session)
 
@@ -178,9 +256,9 @@ async def create_scores_table():
                 if db_type == "postgresql":
                     create_query = text("""
                         CREATE TABLE scores (
-                            id VARCHAR(36) PRIMARY KEY,
-                            message_id VARCHAR(36) NOT NULL,
-                            student_id VARCHAR(36) NOT NULL,
+                            id UUID PRIMARY KEY,
+                            message_id UUID NOT NULL,
+                            student_id UUID NOT NULL,
                             session_id VARCHAR(20) NOT NULL,
                             overall_score INTEGER NOT NULL,
                             depth_score INTEGER NOT NULL,
@@ -188,7 +266,7 @@ async def create_scores_table():
                             application_score INTEGER NOT NULL,
                             metacognition_score INTEGER NOT NULL,
                             engagement_score INTEGER NOT NULL,
-                            evaluation_data JSON,
+                            evaluation_data JSONB,
                             is_completed BOOLEAN DEFAULT FALSE,
                             created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
                             FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE CASCADE,
@@ -202,8 +280,7 @@ async def create_scores_table():
                         CREATE INDEX idx_scores_created_at ON scores(created_at);
                     """)
                 else:
-                    # Create table first
-                    create_table_query = text("""
+                    create_table_query = """
                         CREATE TABLE scores (
                             id TEXT PRIMARY KEY,
                             message_id TEXT NOT NULL,
@@ -222,11 +299,8 @@ async def create_scores_table():
                             FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
                             FOREIGN KEY (session_id) REFERENCES sessions(id) ON DELETE CASCADE
                         )
-                    """)
-
-                    await session.execute(create_table_query)
+                    """
 
-                    # Create indexes separately for SQLite
                     index_queries = [
                         "CREATE INDEX idx_scores_message_id ON scores(message_id)",
                         "CREATE INDEX idx_scores_student_id ON scores(student_id)",
@@ -234,22 +308,25 @@ async def create_scores_table():
                         "CREATE INDEX idx_scores_created_at ON scores(created_at)"
                     ]
 
-                    for index_query in index_queries:
-                        await session.execute(text(index_query))
+                    # Table + indexes in a single executescript call on the aiosqlite worker thread
+                    ddl = ";\n".join([create_table_query, *index_queries]) + ";"
+                    connection = await session.connection()
+                    raw_connection = await connection.get_raw_connection()
+                    await raw_connection.driver_connection.executescript(ddl)
                 await session.commit()
-                print("✅ scores table created successfully with indexes")
+                logger.info("✅ scores table created successfully with indexes")
             else:
-                print("ℹ️ scores table already exists")
+                logger.info("ℹ️ scores table already exists")
 
         except Exception as e:
             await session.rollback()
-            print(f"❌ Error creating scores table: {e}")
+            logger.error("❌ Error creating scores table", exc_info=True)
             raise
 
 
 async def add_student_token_column():
     """Add token column to students table."""
-    async with AsyncSessionLocal() as session:
+    async with _new_session() as session:
         try:
             db_type = await _detect_database_type(session)
 
@@ -274,7 +351,7 @@ async def add_student_token_column():
                 token_exists = 'token' in existing_columns
 
             if not token_exists:
-                print("➕ Adding token column to students table...")
+                logger.info("➕ Adding token column to students table...")
 
                 # Add token column
                 alter_query = text("ALTER TABLE students ADD COLUMN token VARCHAR(50);")
@@ -288,19 +365,19 @@ async def add_student_token_column():
 
                 await session.execute(index_query)
                 await session.commit()
-                print("✅ Token column added to students table")
+                logger.info("✅ Token column added to students table")
             else:
-                print("ℹ️ Token column already exists in students table")
+                logger.info("ℹ️ Token column already exists in students table")
 
         except Exception as e:
             await session.rollback()
-            print(f"❌ Failed to add token column: {e}")
+            logger.error("❌ Failed to add token column", exc_info=True)
             raise
 
 
 async def drop_scores_table():
     """Drop the scores table if it exists."""
-    async with AsyncSessionLocal() as session:
+    async with _new_session() as session:
         try:
             db_type = await _detect_database_type(session)
 
@@ -328,22 +405,22 @@ async def drop_scores_table():
 
                 await session.execute(drop_query)
                 await session.commit()
-                print("✅ scores table dropped successfully")
+                logger.info("✅ scores table dropped successfully")
             else:
-                print("ℹ️ scores table does not exist")
+                logger.info("ℹ️ scores table does not exist")
 
         except Exception as e:
             await session.rollback()
-            print(f"❌ Error dropping scores table: {e}")
+            logger.error("❌ Error dropping scores table", exc_info=True)
             raise
 
 
 async def check_database_health():
     """Check database connection and basic operations."""
-    async with AsyncSessionLocal() as session:
+    async with _new_session() as session:
         try:
             db_type = await _detect_database_type(session)
-            print(f"✅ Database type detected: {db_type}")
+            logger.info("✅ Database type detected: %s", db_type)
 
             # Test basic query
             if db_type == "postgresql":
@@ -353,7 +430,7 @@ async def check_database_health():
 
             result = await session.execute(test_query)
             test_result = result.scalar()
-            print(f"✅ Database connection test: {test_result}")
+            logger.info("✅ Database connection test: %s", test_result)
 
             # Check if messages table exists and is accessible
             if db_type == "postgresql":
@@ -369,36 +446,82 @@ async def check_database_health():
 
             result = await session.execute(table_check)
             table_exists = result.scalar()
-            print(f"✅ Messages table exists: {table_exists > 0}")
+            logger.info("✅ Messages table exists: %s", table_exists > 0)
 
             return True
 
         except Exception as e:
-            print(f"❌ Database health check failed: {e}")
+            logger.error("❌ Database health check failed", exc_info=True)
             return False
 
 
 async def run_migrations():
-    """Run all pending migrations."""
-    print("🔄 Running database migrations...")
-
-    # Check database health first
-    if not await check_database_health():
-        print("❌ Database health check failed, skipping migrations")
-        return
+    """Run all pending migrations (once per process)."""
+    global _done
 
-    await drop_session_activities_table()
-    await drop_score_records_table()
-    await drop_scores_table()
-    await add_deleted_at_column()
-    await add_student_token_column()
+    async with _lock:
+        if _done:
+            return
 
-    # Add topic tracking fields migration
-    from app.migrations.add_topic_tracking_fields import migrate_add_topic_tracking_fields
-    await migrate_add_topic_tracking_fields()
-
-    # Migrate messages table to JSON storage
-    from app.migrations.migrate_messages_to_json import migrate_messages_to_json
-    await migrate_messages_to_json()
-
-    print("✅ Migrations completed")
\ No newline at end of file
+        # One read-only pass over the catalog decides which steps have any work left
+        try:
+            async with _new_session() as session:
+                need = _pending_migrations(*await _load_schema_snapshot(session))
+        except Exception:
+            logger.error("❌ Database health check failed, skipping migrations", exc_info=True)
+            return
+
+        if not any(need.values()):
+            _done = True
+            logger.info("ℹ️ No migrations to apply")
+            return
+
+        logger.info("🔄 Running database migrations...")
+
+        # Check database health first
+        if not await check_database_health():
+            logger.error("❌ Database health check failed, skipping migrations")
+            return
+
+        if need["drop_session_activities"]:
+            await drop_session_activities_table()
+        if need["drop_score_records"]:
+            await drop_score_records_table()
+        if need["drop_scores"]:
+            await drop_scores_table()
+        if need["add_deleted_at"]:
+            await add_deleted_at_column()
+        if need["add_student_token"]:
+            await add_student_token_column()
+
+        # Add topic tracking fields migration
+        if need["topic_tracking"]:
+            from app.migrations.add_topic_tracking_fields import migrate_add_topic_tracking_fields
+            await migrate_add_topic_tracking_fields()
+
+        # Migrate messages table to JSON storage
+        if need["messages_to_json"]:
+            from app.migrations.migrate_messages_to_json import migrate_messages_to_json
+            await migrate_messages_to_json()
+
+        # Store JSON columns as JSONB on PostgreSQL
+        if need["json_to_jsonb"]:
+            from app.migrations.convert_json_to_jsonb import migrate_json_to_jsonb
+            await migrate_json_to_jsonb()
+
+        # Generated turn count needs conversation_data to be JSONB already
+        if need["add_turn_count"]:
+            from app.migrations.add_message_turn_count import add_message_turn_count
+            await add_message_turn_count()
+
+        # Native uuid keys on PostgreSQL
+        if need["ids_to_uuid"]:
+            from app.migrations.convert_ids_to_uuid import migrate_ids_to_uuid
+            await migrate_ids_to_uuid()
+
+        if need["listing_indexes"]:
+            from app.migrations.add_listing_indexes import add_listing_indexes
+            await add_listing_indexes()
+
+        _done = True
+        logger.info("✅ Migrations completed")
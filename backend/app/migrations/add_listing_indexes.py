@@ -0,0 +1,36 @@
+"""
+Add composite indexes backing per-session listings.
+
+- students(session_id, joined_at): roster ordered by join time
+- messages(session_id, timestamp): session conversations ordered by activity
+
+The single-column messages indexes on session_id and timestamp are dropped:
+the composite index serves both, and every message save rewrites timestamp.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+LISTING_INDEXES = {
+    "idx_students_session_joined": "CREATE INDEX IF NOT EXISTS idx_students_session_joined ON students(session_id, joined_at)",
+    "idx_messages_session_timestamp": "CREATE INDEX IF NOT EXISTS idx_messages_session_timestamp ON messages(session_id, timestamp)",
+}
+
+# Covered by idx_messages_session_timestamp
+REDUNDANT_INDEXES = ("ix_messages_session_id", "ix_messages_timestamp")
+
+
+async def add_listing_indexes():
+    """Create the composite listing indexes that are missing and drop the ones they cover."""
+    async with engine.begin() as conn:
+        for name, ddl in LISTING_INDEXES.items():
+            await conn.execute(text(ddl))
+            logger.info("✅ Index %s ready", name)
+        for name in REDUNDANT_INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            logger.info("✅ Redundant index %s dropped", name)
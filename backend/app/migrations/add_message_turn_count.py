@@ -0,0 +1,24 @@
+"""
+Add messages.turn_count as a stored generated column on PostgreSQL.
+
+The database keeps it equal to jsonb_array_length(conversation_data), so
+callers can read the turn count without loading the conversation itself.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+async def add_message_turn_count():
+    """Add the generated turn_count column to messages if it is missing."""
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            ALTER TABLE messages ADD COLUMN IF NOT EXISTS turn_count INTEGER
+            GENERATED ALWAYS AS (jsonb_array_length(conversation_data)) STORED
+        """))
+        logger.info("✅ messages.turn_count generated column ready")
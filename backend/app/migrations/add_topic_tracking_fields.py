@@ -23,8 +23,8 @@ async def migrate_add_topic_tracking_fields():
         # Add new columns to sessions table
         """
         ALTER TABLE sessions
-        ADD COLUMN IF NOT EXISTS topic_type VARCHAR(20) DEFAULT 'manual',
-        ADD COLUMN IF NOT EXISTS topic_source VARCHAR(20) DEFAULT 'manual',
+        ADD COLUMN IF NOT EXISTS topic_type VARCHAR(20) NOT NULL DEFAULT 'manual',
+        ADD COLUMN IF NOT EXISTS topic_source VARCHAR(20) NOT NULL DEFAULT 'manual',
         ADD COLUMN IF NOT EXISTS pdf_noun_topic VARCHAR(500),
         ADD COLUMN IF NOT EXISTS pdf_sentence_topic TEXT,
         ADD COLUMN IF NOT EXISTS pdf_summary_topic TEXT,
@@ -34,33 +34,24 @@ async def migrate_add_topic_tracking_fields():
         ADD COLUMN IF NOT EXISTS topic_metadata JSONB
         """,
 
-        # Create index for topic_type
-        """
-        CREATE INDEX IF NOT EXISTS idx_sessions_topic_type ON sessions(topic_type)
-        """,
-
-        # Create index for topic_source
-        """
-        CREATE INDEX IF NOT EXISTS idx_sessions_topic_source ON sessions(topic_source)
-        """,
-
-        # Update existing sessions to populate new fields
+        # topic_type/topic_source get their default from the catalog; only the topic text is copied
         """
         UPDATE sessions
-        SET
-            final_topic_content = topic,
-            topic_type = 'manual',
-            topic_source = 'manual'
+        SET final_topic_content = topic
         WHERE final_topic_content IS NULL OR final_topic_content = ''
-        """,
+        """
+    ]
 
-        # For any remaining NULL values, set to existing topic
+    # Built after the backfill, outside the transaction, so sessions stays writable
+    index_migrations = [
         """
-        UPDATE sessions
-        SET final_topic_content = topic
-        WHERE final_topic_content IS NULL
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_topic_type ON sessions(topic_type)
+        """,
         """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_topic_source ON sessions(topic_source)
+        """,
     ]
+    total_steps = len(migrations) + len(index_migrations)
 
     try:
         async with engine.begin() as conn:
@@ -68,19 +59,27 @@ async def migrate_add_topic_tracking_fields():
             for i, migration_sql in enumerate(migrations, 1):
                 try:
                     await conn.execute(text(migration_sql))
-                    logger.info(f"✅ Migration step {i}/{len(migrations)} completed")
+                    logger.info(f"✅ Migration step {i}/{total_steps} completed")
                 except Exception as step_error:
                     logger.warning(f"⚠️ Migration step {i} failed (may be already applied): {step_error}")
                     # Continue with other steps even if one fails
 
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for i, index_sql in enumerate(index_migrations, len(migrations) + 1):
+                try:
+                    await conn.execute(text(index_sql))
+                    logger.info(f"✅ Migration step {i}/{total_steps} completed")
+                except Exception as step_error:
+                    logger.warning(f"⚠️ Migration step {i} failed (may be already applied): {step_error}")
+
             logger.info("✅ Successfully added topic tracking fields to sessions table")
-            print("✅ Successfully added topic tracking fields to sessions table")
 
         return True
 
     except Exception as e:
-        logger.error(f"❌ Migration failed: {e}")
-        print(f"❌ Migration failed: {e}")
+        logger.error("❌ Migration failed: %s", e)
         return False
 
 async def rollback_topic_tracking_fields():
@@ -0,0 +1,60 @@
+"""
+Store UUID keys as native uuid on PostgreSQL.
+
+VARCHAR(36) keys take 37 bytes per value and compare as strings; uuid is a
+fixed 16 bytes. Foreign keys between the converted columns are dropped,
+every column is converted, and the constraints are recreated from their
+original definitions so the types never mismatch mid-migration.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+UUID_COLUMNS = [
+    ("teachers", "id"),
+    ("sessions", "teacher_id"),
+    ("students", "id"),
+    ("messages", "id"),
+    ("messages", "student_id"),
+    ("scores", "id"),
+    ("scores", "message_id"),
+    ("scores", "student_id"),
+]
+
+
+async def migrate_ids_to_uuid():
+    """Convert the remaining VARCHAR UUID key columns to uuid."""
+    async with engine.begin() as conn:
+        result = await conn.execute(text("""
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = 'public' AND data_type = 'character varying'
+        """))
+        varchar_columns = {(row[0], row[1]) for row in result.fetchall()}
+        pending = [key for key in UUID_COLUMNS if key in varchar_columns]
+        if not pending:
+            return
+
+        tables = sorted({table for table, _ in UUID_COLUMNS})
+        result = await conn.execute(text("""
+            SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE contype = 'f' AND confrelid::regclass::text = ANY(:tables)
+        """), {"tables": tables})
+        foreign_keys = result.fetchall()
+
+        for table, name, _ in foreign_keys:
+            await conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+
+        for table, column in pending:
+            await conn.execute(text(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE UUID USING {column}::uuid"
+            ))
+            logger.info("✅ %s.%s converted to UUID", table, column)
+
+        for table, name, definition in foreign_keys:
+            await conn.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'))
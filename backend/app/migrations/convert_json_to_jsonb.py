@@ -0,0 +1,47 @@
+"""
+Convert JSON columns to JSONB on PostgreSQL.
+
+JSON is stored as text and re-parsed on every read; JSONB is stored parsed.
+- messages.conversation_data
+- sessions.topic_metadata
+- scores.evaluation_data
+"""
+
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+JSONB_COLUMNS = [
+    ("messages", "conversation_data"),
+    ("sessions", "topic_metadata"),
+    ("scores", "evaluation_data"),
+]
+
+
+async def migrate_json_to_jsonb():
+    """Rewrite any remaining JSON columns as JSONB."""
+    async with engine.begin() as conn:
+        result = await conn.execute(text("""
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = 'public' AND data_type = 'json'
+        """))
+        json_columns = {(row[0], row[1]) for row in result.fetchall()}
+
+        for table, column in JSONB_COLUMNS:
+            if (table, column) not in json_columns:
+                continue
+
+            await conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT"))
+            await conn.execute(text(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"
+            ))
+            logger.info("✅ %s.%s converted to JSONB", table, column)
+
+        if ("messages", "conversation_data") in json_columns:
+            await conn.execute(text(
+                "ALTER TABLE messages ALTER COLUMN conversation_data SET DEFAULT '[]'::jsonb"
+            ))
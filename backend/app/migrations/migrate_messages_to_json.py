@@ -1,21 +1,33 @@
 """
 Migrate messages table to store conversation as JSON array.
+- Fold: legacy per-message rows into one conversation_data array per student
 - Remove: content, message_type, extra_data columns
-- Add: conversation_data JSON column
+- Add: conversation_data JSONB column
 - Add: unique constraint on student_id
 """
 
+import logging
+
 from app.core.database import engine
 from sqlalchemy import text
 
+logger = logging.getLogger(__name__)
+
 
 async def migrate_messages_to_json():
     """Alter messages table schema to store conversation as JSON."""
-    print("🔄 Migrating messages table to JSON storage format...")
+    logger.info("🔄 Migrating messages table to JSON storage format...")
 
     async with engine.begin() as conn:
+        legacy_check = await conn.execute(text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = 'messages' AND column_name = 'content'
+        """))
+        if legacy_check.first() is not None:
+            await _fold_legacy_messages(conn)
+
         # Remove old columns
-        print("  📝 Removing old columns (content, message_type, extra_data)...")
+        logger.info("  📝 Removing old columns (content, message_type, extra_data)...")
         await conn.execute(text("""
             ALTER TABLE messages
             DROP COLUMN IF EXISTS content,
@@ -24,20 +36,74 @@ async def migrate_messages_to_json():
         """))
 
         # Add conversation_data column
-        print("  📝 Adding conversation_data JSON column...")
+        logger.info("  📝 Adding conversation_data JSONB column...")
         await conn.execute(text("""
             ALTER TABLE messages
-            ADD COLUMN IF NOT EXISTS conversation_data JSON DEFAULT CAST('[]' AS json)
+            ADD COLUMN IF NOT EXISTS conversation_data JSONB DEFAULT '[]'::jsonb
         """))
 
         # Add unique constraint on student_id
-        print("  📝 Adding unique constraint on student_id...")
+        logger.info("  📝 Adding unique constraint on student_id...")
         await conn.execute(text("""
             CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_student_id_unique
             ON messages (student_id)
         """))
 
-        print("✅ Messages table migration completed")
-        print("   - Old columns removed: content, message_type, extra_data")
-        print("   - New column added: conversation_data (JSON)")
-        print("   - Constraint added: student_id UNIQUE")
+        logger.info("✅ Messages table migration completed")
+        logger.info("   - Old columns removed: content, message_type, extra_data")
+        logger.info("   - New column added: conversation_data (JSONB)")
+        logger.info("   - Constraint added: student_id UNIQUE")
+
+
+async def _fold_legacy_messages(conn):
+    """Collapse legacy one-row-per-message data into one conversation_data row per student.
+
+    The history is built server-side with a single aggregate UPDATE instead of a
+    SELECT + UPDATE round-trip per student.
+    """
+    logger.info("  📝 Folding legacy message rows into conversation_data...")
+    await conn.execute(text("""
+        ALTER TABLE messages
+        ADD COLUMN IF NOT EXISTS conversation_data JSONB DEFAULT '[]'::jsonb
+    """))
+
+    # Lets the GROUP BY student_id ... ORDER BY timestamp read rows in index order.
+    # INCLUDE makes the keeper lookup index-only; content is left out because long
+    # chat turns would exceed the btree row size limit.
+    await conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_messages_student_timestamp
+        ON messages (student_id, timestamp) INCLUDE (id, message_type)
+    """))
+
+    # Keep the earliest row per student and store the whole history on it
+    await conn.execute(text("""
+        UPDATE messages m
+        SET conversation_data = history.conversation
+        FROM (
+            SELECT DISTINCT ON (student_id) id, student_id
+            FROM messages
+            ORDER BY student_id, timestamp
+        ) keeper
+        JOIN (
+            SELECT
+                student_id,
+                jsonb_agg(
+                    jsonb_build_object('role', message_type, 'content', content)
+                    ORDER BY timestamp
+                ) AS conversation
+            FROM messages
+            GROUP BY student_id
+        ) history ON history.student_id = keeper.student_id
+        WHERE m.id = keeper.id
+    """))
+
+    await conn.execute(text("""
+        DELETE FROM messages
+        WHERE id NOT IN (
+            SELECT DISTINCT ON (student_id) id
+            FROM messages
+            ORDER BY student_id, timestamp
+        )
+    """))
+
+    await conn.execute(text("DROP INDEX IF EXISTS idx_messages_student_timestamp"))
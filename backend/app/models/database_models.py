@@ -5,20 +5,93 @@ from datetime import datetime
 from typing import List, Optional
 
 from sqlalchemy import (
-    Boolean, DateTime, ForeignKey, Integer, String, Text, JSON
+    Boolean, Computed, DateTime, ForeignKey, Index, Integer, String, Text, JSON, literal_column
 )
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import configure_mappers, relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.core.database import Base
 
+# Binary JSON on PostgreSQL (parsed once on write), plain JSON elsewhere (SQLite)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+# UUID keys: native 16-byte uuid on PostgreSQL, 36-char text elsewhere; Python sees str either way
+UUIDType = String(36).with_variant(UUID(as_uuid=False), "postgresql")
+
+
+class json_array_length(FunctionElement):
+    """Length of a JSON array, rendered with each dialect's function name."""
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(json_array_length)
+def _json_array_length(element, compiler, **kw):
+    return "json_array_length(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(json_array_length, "postgresql")
+def _jsonb_array_length(element, compiler, **kw):
+    return "jsonb_array_length(%s)" % compiler.process(element.clauses, **kw)
+
+
+class json_array_append(FunctionElement):
+    """Append a JSON-encoded value to a JSON array column inside the database."""
+    type = JSONType
+    inherit_cache = True
+
+
+@compiles(json_array_append)
+def _json_array_append(element, compiler, **kw):
+    array, value = element.clauses
+    return "json_insert(%s, '$[#]', json(%s))" % (
+        compiler.process(array, **kw), compiler.process(value, **kw)
+    )
+
+
+@compiles(json_array_append, "postgresql")
+def _jsonb_array_append(element, compiler, **kw):
+    array, value = element.clauses
+    return "(%s || jsonb_build_array(CAST(%s AS JSONB)))" % (
+        compiler.process(array, **kw), compiler.process(value, **kw)
+    )
+
+
+class json_array_tail(FunctionElement):
+    """The last N elements of a JSON array column, sliced inside the database."""
+    type = JSONType
+    inherit_cache = True
+
+
+@compiles(json_array_tail)
+def _json_array_tail(element, compiler, **kw):
+    array, count = element.clauses
+    array_sql = compiler.process(array, **kw)
+    return (
+        "(SELECT json_group_array(json(value)) FROM json_each(%s) "
+        "WHERE key >= json_array_length(%s) - %s)"
+    ) % (array_sql, array_sql, compiler.process(count, **kw))
+
+
+@compiles(json_array_tail, "postgresql")
+def _jsonb_array_tail(element, compiler, **kw):
+    array, count = element.clauses
+    array_sql = compiler.process(array, **kw)
+    return (
+        "jsonb_path_query_array(%s, CAST('$[' || GREATEST(jsonb_array_length(%s) - %s, 0) "
+        "|| ' to last]' AS JSONPATH))"
+    ) % (array_sql, array_sql, compiler.process(count, **kw))
+
 
 class Teacher(Base):
     """Teacher model."""
     __tablename__ = "teachers"
 
     id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         primary_key=True,
         default=lambda: str(uuid.uuid4())
     )
@@ -38,11 +111,12 @@ class Teacher(Base):
         onupdate=func.now()
     )
 
-    # Relationships
+    # Relationships (lazy="raise": load them with selectinload where they are needed)
     sessions: Mapped[List["Session"]] = relationship(
         "Session",
         back_populates="teacher",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
 
 
@@ -52,7 +126,7 @@ class Session(Base):
 
     id: Mapped[str] = mapped_column(String(20), primary_key=True)
     teacher_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("teachers.id", ondelete="CASCADE"),
         nullable=False,
         index=True
@@ -83,7 +157,7 @@ class Session(Base):
     final_topic_content: Mapped[str] = mapped_column(Text, nullable=False)  # Final processed topic for AI
 
     # Topic metadata
-    topic_metadata: Mapped[Optional[dict]] = mapped_column(JSON)  # Additional topic information
+    topic_metadata: Mapped[Optional[dict]] = mapped_column(JSONType)  # Additional topic information
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -103,30 +177,36 @@ class Session(Base):
     deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
-    teacher: Mapped["Teacher"] = relationship("Teacher", back_populates="sessions")
+    teacher: Mapped["Teacher"] = relationship("Teacher", back_populates="sessions", lazy="raise")
     students: Mapped[List["Student"]] = relationship(
         "Student",
         back_populates="session",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
     messages: Mapped[List["Message"]] = relationship(
         "Message",
         back_populates="session",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
     scores: Mapped[List["Score"]] = relationship(
         "Score",
         back_populates="session",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
 
 
 class Student(Base):
     """Student model."""
     __tablename__ = "students"
+    __table_args__ = (
+        Index("idx_students_session_joined", "session_id", "joined_at"),
+    )
 
     id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         primary_key=True,
         default=lambda: str(uuid.uuid4())
     )
@@ -159,30 +239,35 @@ class Student(Base):
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
-    session: Mapped["Session"] = relationship("Session", back_populates="students")
+    session: Mapped["Session"] = relationship("Session", back_populates="students", lazy="raise")
     messages: Mapped[List["Message"]] = relationship(
         "Message",
         back_populates="student",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
     scores: Mapped[List["Score"]] = relationship(
         "Score",
         back_populates="student",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
 
 
 class Message(Base):
     """Message model - stores entire conversation as JSON array."""
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("idx_messages_session_timestamp", "session_id", "timestamp"),
+    )
 
     id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         primary_key=True,
         default=lambda: str(uuid.uuid4())
     )
     student_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("students.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
@@ -191,23 +276,26 @@ class Message(Base):
     session_id: Mapped[str] = mapped_column(
         String(20),
         ForeignKey("sessions.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
-    )
-    conversation_data: Mapped[list] = mapped_column(JSON, nullable=False, default=list)  # [{"role": "user", "content": "..."}, ...]
+        nullable=False
+    )  # Lookups by session use idx_messages_session_timestamp
+    conversation_data: Mapped[list] = mapped_column(JSONType, nullable=False, default=list)  # [{"role": "user", "content": "..."}, ...]
+    turn_count: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        Computed(json_array_length(literal_column("conversation_data")), persisted=True)
+    )  # Number of entries in conversation_data, maintained by the database
     timestamp: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        server_default=func.now(),
-        index=True
-    )
+        server_default=func.now()
+    )  # Rewritten on every save; only indexed together with session_id
 
     # Relationships
-    student: Mapped["Student"] = relationship("Student", back_populates="messages")
-    session: Mapped["Session"] = relationship("Session", back_populates="messages")
+    student: Mapped["Student"] = relationship("Student", back_populates="messages", lazy="raise")
+    session: Mapped["Session"] = relationship("Session", back_populates="messages", lazy="raise")
     scores: Mapped[List["Score"]] = relationship(
         "Score",
         back_populates="message",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
 
 
@@ -216,18 +304,18 @@ class Score(Base):
     __tablename__ = "scores"
 
     id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         primary_key=True,
         default=lambda: str(uuid.uuid4())
     )
     message_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("messages.id", ondelete="CASCADE"),
         nullable=False,
         index=True
     )
     student_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("students.id", ondelete="CASCADE"),
         nullable=False,
         index=True
@@ -248,7 +336,7 @@ class Score(Base):
     engagement_score: Mapped[int] = mapped_column(Integer, nullable=False)
 
     # Evaluation metadata
-    evaluation_data: Mapped[Optional[dict]] = mapped_column(JSON)
+    evaluation_data: Mapped[Optional[dict]] = mapped_column(JSONType)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
 
     # Timestamps
@@ -259,9 +347,10 @@ class Score(Base):
     )
 
     # Relationships
-    message: Mapped["Message"] = relationship("Message", back_populates="scores")
-    student: Mapped["Student"] = relationship("Student", back_populates="scores")
-    session: Mapped["Session"] = relationship("Session", back_populates="scores")
-
+    message: Mapped["Message"] = relationship("Message", back_populates="scores", lazy="raise")
+    student: Mapped["Student"] = relationship("Student", back_populates="scores", lazy="raise")
+    session: Mapped["Session"] = relationship("Session", back_populates="scores", lazy="raise")
 
 
+# Resolve relationships now rather than on the first query of a request
+configure_mappers()
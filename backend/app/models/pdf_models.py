@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from fastapi import UploadFile
 
@@ -8,6 +8,8 @@ class PdfAnalysisRequest(BaseModel):
 
 class PdfAnalysisResult(BaseModel):
     """PDF 분석 결과 모델 (통합 기능용으로 단순화)"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     original_text: str
     compressed_content: str  # 압축된 PDF 본문 (핵심 기능)
     one_sentence_topic: str  # 한 문장 학습 주제 (UI 노출용, 핵심 기능)
@@ -17,9 +19,9 @@ class PdfAnalysisResult(BaseModel):
 
     # 레거시 필드들 (하위 호환성을 위해 기본값 제공)
     summary: str = ""
-    key_concepts: List[str] = []
+    key_concepts: List[str] = Field(default_factory=list)
     main_keyword: str = ""
-    learning_objectives: List[str] = []
+    learning_objectives: List[str] = Field(default_factory=list)
     estimated_duration: int = 30
 
 class TopicCombineRequest(BaseModel):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Any, Optional
 
 class TopicInputRequest(BaseModel):
@@ -12,6 +12,8 @@ class SocraticChatRequest(BaseModel):
     difficulty: str = "normal"  # "easy", "normal", "hard"
 
 class SocraticChatResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     socratic_response: str
     understanding_score: int
     is_completed: bool = False
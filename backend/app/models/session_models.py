@@ -1,13 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
+from typing_extensions import NotRequired, TypedDict  # pydantic needs typing_extensions' TypedDict before 3.12
 from datetime import datetime
 
 class SessionConfig(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     title: str
     topic: str
     description: Optional[str] = None
     difficulty: str = "normal"  # easy, normal, hard
     show_score: bool = True
+    time_limit: Optional[int] = None  # 분 단위, stored on sessions.time_limit
+    max_students: Optional[int] = None
 
     # Enhanced topic tracking fields
     source_type: str = "manual"  # "manual", "pdf", "hybrid"
@@ -37,11 +42,15 @@ class SessionCreateRequest(BaseModel):
     teacher_fingerprint: str
 
 class QRCodeInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     url: str
     image_data: str  # base64 encoded PNG
     download_url: str
 
 class SessionInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str
     config: SessionConfig
     status: str  # active (single state)
@@ -53,7 +62,16 @@ class SessionCreateResponse(BaseModel):
     session: SessionInfo
     qr_code: QRCodeInfo
 
-class StudentProgress(BaseModel):
+class SessionActivity(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    type: str  # join, complete, message, milestone
+    student_id: Optional[str] = None
+    timestamp: datetime
+    data: Dict[str, Any]
+
+# Dashboard response shapes are TypedDicts: validated as plain dicts, no model instance per student
+class StudentProgress(TypedDict):
     student_id: str
     student_name: str
     latest_score: int  # 최근 점수
@@ -65,24 +83,18 @@ class StudentProgress(BaseModel):
     progress_percentage: int
     conversation_turns: int
     current_dimensions: Dict[str, int]
-    last_message: Optional[str] = None
-    is_completed: bool = False
+    last_message: NotRequired[Optional[str]]
+    is_completed: NotRequired[bool]
 
-class LiveStats(BaseModel):
+class LiveStats(TypedDict):
     current_students: int
     total_joined: int
     average_score: float
     completion_rate: float
     dimension_averages: Dict[str, float]
-    recent_activities: List[Dict[str, Any]]
-
-class SessionActivity(BaseModel):
-    type: str  # join, complete, message, milestone
-    student_id: Optional[str] = None
-    timestamp: datetime
-    data: Dict[str, Any]
+    recent_activities: List[SessionActivity]
 
-class SessionDetailsResponse(BaseModel):
+class SessionDetailsResponse(TypedDict):
     session: SessionInfo
     live_stats: LiveStats
     students: List[StudentProgress]
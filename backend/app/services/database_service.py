@@ -1,114 +1,242 @@
 """Database service using SQLAlchemy to replace file-based storage."""
 
-from typing import Dict, List, Any, Optional
-from datetime import datetime
-import json
-import pytz
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Tuple
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import logging
+import time
+import orjson
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, and_, or_, func
-from sqlalchemy.orm import selectinload
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import select, update, delete, and_, or_, func, case, lambda_stmt
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.core.database import AsyncSessionLocal
-from app.models.database_models import Teacher, Session, Student, Message, Score
+from app.models.database_models import (
+    Teacher, Session, Student, Message, Score, json_array_append, json_array_tail
+)
+
+logger = logging.getLogger(__name__)
+
+KST = ZoneInfo('Asia/Seoul')
+
+# Live stats are polled by every open dashboard: keep each session's aggregate row briefly
+LIVE_STATS_TTL_SECONDS = 5.0
+LIVE_STATS_CACHE_SIZE = 1024
+
+# Teachers are upserted on every session save; refresh last_seen at most once a minute per fingerprint
+TEACHER_CACHE_TTL_SECONDS = 60.0
+TEACHER_CACHE_SIZE = 1024
+
+# Columns behind every score dict returned by the score getters
+SCORE_COLUMNS = (
+    Score.id, Score.message_id, Score.overall_score,
+    Score.depth_score, Score.breadth_score, Score.application_score,
+    Score.metacognition_score, Score.engagement_score,
+    Score.evaluation_data, Score.is_completed, Score.created_at,
+)
+
+# load_students returns only the newest entries of each conversation (sliced inside the database)
+LOAD_STUDENTS_MESSAGE_LIMIT = 50
+
+
+def _manual_topic_fields(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Topic columns for a manually entered topic."""
+    topic = config.get('topic')
+    return {
+        'topic_type': 'manual',
+        'topic_source': 'manual',
+        'manual_topic_content': config.get('manual_content') or topic,
+        'final_topic_content': config.get('combined_topic') or topic,
+    }
+
+
+def _pdf_topic_fields(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Topic columns for a topic extracted from a PDF."""
+    fields = {}
+    # Determine which PDF variant based on what's available
+    pdf_content = config.get('pdf_content')
+    if pdf_content:
+        # Check if it's the compressed content (longer) or others
+        pdf_length = len(pdf_content)
+        if pdf_length > 500:  # Likely the compressed content (요약 줄글)
+            fields['topic_type'] = 'pdf_summary'
+            fields['pdf_summary_topic'] = pdf_content
+        elif pdf_length < 50:  # Likely noun topic (명사형)
+            fields['topic_type'] = 'pdf_noun'
+            fields['pdf_noun_topic'] = pdf_content
+        else:  # Likely sentence topic (한 문장)
+            fields['topic_type'] = 'pdf_sentence'
+            fields['pdf_sentence_topic'] = pdf_content
+    else:
+        fields['topic_type'] = 'pdf_summary'  # Default fallback
+
+    fields['topic_source'] = 'pdf'
+    fields['pdf_original_content'] = config.get('original_text')
+    fields['final_topic_content'] = config.get('combined_topic') or config.get('topic')
+    return fields
+
+
+def _hybrid_topic_fields(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Topic columns for a PDF summary combined with manual content."""
+    return {
+        'topic_type': 'hybrid',
+        'topic_source': 'hybrid',
+        'pdf_summary_topic': config.get('pdf_content'),
+        'manual_topic_content': config.get('manual_content'),
+        'final_topic_content': config.get('combined_topic') or config.get('topic'),
+    }
+
+
+def _fallback_topic_fields(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Topic columns for an unknown source type: treat the plain topic as manual."""
+    topic = config.get('topic')
+    return {
+        'topic_type': 'manual',
+        'topic_source': 'manual',
+        'manual_topic_content': topic,
+        'final_topic_content': topic,
+    }
+
+
+# source_type -> builder of the topic tracking columns
+TOPIC_FIELD_BUILDERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'manual': _manual_topic_fields,
+    'pdf': _pdf_topic_fields,
+    'hybrid': _hybrid_topic_fields,
+}
 
 
 class DatabaseService:
     """Database service for persistent storage using SQLAlchemy."""
 
     def __init__(self):
-        self.kst = pytz.timezone('Asia/Seoul')
-
-    async def _get_session(self) -> AsyncSession:
+        # session_id -> (monotonic fetch time, aggregate row or None when the session has no students)
+        self._live_stats_cache: "OrderedDict[str, Tuple[float, Optional[tuple]]]" = OrderedDict()
+        self._live_stats_hits = 0
+        self._live_stats_misses = 0
+        # fingerprint -> (teacher_id, monotonic time of the last upsert)
+        self._teacher_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def _get_session(self) -> AsyncSession:
         """Get database session."""
         return AsyncSessionLocal()
 
+    @asynccontextmanager
+    async def _scope(self, db_session: Optional[AsyncSession] = None) -> AsyncIterator[AsyncSession]:
+        """Use the caller's session if one is given (left open for them), otherwise open our own."""
+        if db_session is None:
+            async with self._get_session() as session:
+                yield session
+            return
+        try:
+            yield db_session
+        except Exception:
+            # Keep the shared session usable for the caller's next query
+            await db_session.rollback()
+            raise
+
     async def get_or_create_teacher(self, fingerprint: str) -> str:
         """Get or create teacher by fingerprint and return teacher_id."""
-        async with await self._get_session() as session:
-            # Try to find existing teacher
-            stmt = select(Teacher).where(Teacher.fingerprint == fingerprint)
-            result = await session.execute(stmt)
-            teacher = result.scalar_one_or_none()
-
-            if teacher:
-                # Update last_seen
-                teacher.last_seen = datetime.now(self.kst)
-                await session.commit()
-                return teacher.id
-            else:
-                # Create new teacher
-                teacher = Teacher(fingerprint=fingerprint)
-                session.add(teacher)
+        try:
+            async with self._get_session() as session:
+                teacher_id = await self._get_or_create_teacher(session, fingerprint)
                 await session.commit()
-                return teacher.id
+                return teacher_id
+        except Exception:
+            self._teacher_cache.pop(fingerprint, None)
+            raise
+
+    async def _get_or_create_teacher(self, session: AsyncSession, fingerprint: str) -> str:
+        """Get or create teacher inside the caller's transaction (caller commits).
+
+        Callers must drop the cache entry if their transaction fails.
+        """
+        now = time.monotonic()
+        cached = self._teacher_cache.get(fingerprint)
+        if cached is not None and now - cached[1] < TEACHER_CACHE_TTL_SECONDS:
+            self._teacher_cache.move_to_end(fingerprint)
+            return cached[0]
+
+        # One atomic statement: create the teacher, or bump last_seen if the fingerprint exists
+        insert = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+        upsert_stmt = insert(Teacher).values(fingerprint=fingerprint)
+        upsert_stmt = upsert_stmt.on_conflict_do_update(
+            index_elements=[Teacher.fingerprint],
+            set_={"last_seen": func.now()}
+        ).returning(Teacher.id)
+        teacher_id = (await session.execute(upsert_stmt)).scalar_one()
+
+        self._teacher_cache[fingerprint] = (teacher_id, now)
+        self._teacher_cache.move_to_end(fingerprint)
+        while len(self._teacher_cache) > TEACHER_CACHE_SIZE:
+            self._teacher_cache.popitem(last=False)
+        return teacher_id
 
     async def save_session(self, session_id: str, session_data: Dict[str, Any]) -> bool:
         """Save a session to database."""
         try:
-            async with await self._get_session() as db_session:
-                teacher_id = await self.get_or_create_teacher(session_data['teacher_fingerprint'])
-
-                # Check if session exists
-                stmt = select(Session).where(Session.id == session_id)
-                result = await db_session.execute(stmt)
-                existing_session = result.scalar_one_or_none()
-
-                if existing_session:
-                    # Update existing session
-                    existing_session.title = session_data['config'].get('title')
-                    existing_session.topic = session_data['config']['topic']
-                    existing_session.description = session_data['config'].get('description')
-                    existing_session.difficulty = session_data['config'].get('difficulty', 'normal')
-                    existing_session.show_score = session_data['config'].get('show_score', True)
-                    existing_session.time_limit = session_data['config'].get('time_limit')
-                    existing_session.max_students = session_data['config'].get('max_students')
-                    existing_session.status = session_data.get('status', 'active')
-                    existing_session.last_activity = self._parse_datetime(session_data.get('last_activity'))
-                    existing_session.ended_at = self._parse_datetime(session_data.get('ended_at'))
-
-                    # Update enhanced topic tracking fields
-                    self._update_topic_fields(existing_session, session_data['config'])
-                else:
-                    # Create new session
-                    new_session = Session(
-                        id=session_id,
-                        teacher_id=teacher_id,
-                        title=session_data['config'].get('title'),
-                        topic=session_data['config']['topic'],
-                        description=session_data['config'].get('description'),
-                        difficulty=session_data['config'].get('difficulty', 'normal'),
-                        show_score=session_data['config'].get('show_score', True),
-                        time_limit=session_data['config'].get('time_limit'),
-                        max_students=session_data['config'].get('max_students'),
-                        status=session_data.get('status', 'active'),
-                        created_at=self._parse_datetime(session_data.get('created_at')),
-                        expires_at=self._parse_datetime(session_data['expires_at']),
-                        last_activity=self._parse_datetime(session_data.get('last_activity')),
-                        ended_at=self._parse_datetime(session_data.get('ended_at'))
-                    )
-
-                    # Set enhanced topic tracking fields for new session
-                    self._update_topic_fields(new_session, session_data['config'])
-                    db_session.add(new_session)
+            async with self._get_session() as db_session:
+                teacher_id = await self._get_or_create_teacher(db_session, session_data['teacher_fingerprint'])
+
+                config = session_data['config']
+                # Columns refreshed on every save (the UPDATE half of the upsert)
+                update_values = {
+                    'title': config.get('title'),
+                    'topic': config['topic'],
+                    'description': config.get('description'),
+                    'difficulty': config.get('difficulty', 'normal'),
+                    'show_score': config.get('show_score', True),
+                    'time_limit': config.get('time_limit'),
+                    'max_students': config.get('max_students'),
+                    'status': session_data.get('status', 'active'),
+                    'last_activity': self._parse_datetime(session_data.get('last_activity')),
+                    'ended_at': self._parse_datetime(session_data.get('ended_at')),
+                    # Enhanced topic tracking fields
+                    **self._topic_fields(config)
+                }
+                insert_values = {
+                    'id': session_id,
+                    'teacher_id': teacher_id,
+                    'created_at': self._parse_datetime(session_data.get('created_at')),
+                    'expires_at': self._parse_datetime(session_data['expires_at']),
+                    **update_values
+                }
+                # Missing timestamps fall back to the server defaults on insert
+                for column in ('created_at', 'last_activity'):
+                    if insert_values[column] is None:
+                        del insert_values[column]
+
+                # One statement: create the session, or update it in place if the id exists
+                insert = pg_insert if db_session.bind.dialect.name == "postgresql" else sqlite_insert
+                upsert_stmt = insert(Session).values(**insert_values)
+                upsert_stmt = upsert_stmt.on_conflict_do_update(
+                    index_elements=[Session.id],
+                    set_={column: upsert_stmt.excluded[column] for column in update_values}
+                )
+                await db_session.execute(upsert_stmt)
 
                 await db_session.commit()
                 return True
         except Exception as e:
-            print(f"Error saving session {session_id}: {e}")
+            logger.error("Error saving session %s: %s", session_id, e)
+            self._teacher_cache.pop(session_data.get('teacher_fingerprint'), None)
             return False
 
     async def load_sessions(self) -> Dict[str, Any]:
         """Load all active (non-deleted) sessions from database."""
         try:
-            async with await self._get_session() as session:
-                stmt = select(Session).options(selectinload(Session.teacher)).where(Session.deleted_at.is_(None))
-                result = await session.execute(stmt)
-                db_sessions = result.scalars().all()
+            async with self._get_session() as session:
+                stmt = select(Session).options(joinedload(Session.teacher)).where(Session.deleted_at.is_(None))
+                # Stream in chunks instead of materializing every Session entity at once
+                result = await session.stream_scalars(stmt.execution_options(yield_per=200))
 
                 sessions_dict = {}
-                for db_session in db_sessions:
+                async for db_session in result:
                     sessions_dict[db_session.id] = {
                         'id': db_session.id,
                         'teacher_fingerprint': db_session.teacher.fingerprint,
@@ -127,82 +255,91 @@ class DatabaseService:
                         'last_activity': db_session.last_activity.isoformat(),
                         'ended_at': db_session.ended_at.isoformat() if db_session.ended_at else None,
                         'students': {},  # Will be populated separately
-                        'live_stats': await self._calculate_live_stats(db_session.id),
                     }
 
+                live_stats = await self._calculate_live_stats_bulk(session, list(sessions_dict))
+                for session_id, session_data in sessions_dict.items():
+                    session_data['live_stats'] = live_stats[session_id]
+
                 return sessions_dict
         except Exception as e:
-            print(f"Error loading sessions: {e}")
+            logger.error("Error loading sessions: %s", e)
             return {}
 
     async def save_session_students(self, session_id: str, session_students: Dict[str, Any]) -> bool:
         """Save students for a specific session."""
+        if not session_students:
+            return True
         try:
-            async with await self._get_session() as db_session:
+            async with self._get_session() as db_session:
+                now = datetime.now(KST)
+                rows = []
                 for student_id, student_data in session_students.items():
-                    # Check if student exists
-                    stmt = select(Student).where(Student.id == student_id)
-                    result = await db_session.execute(stmt)
-                    existing_student = result.scalar_one_or_none()
-
-                    if existing_student:
-                        # Update existing student
-                        existing_student.name = student_data.get('name', '익명')
-                        existing_student.token = student_data.get('token')  # Update token
-                        existing_student.last_active = self._parse_datetime(student_data.get('last_active'))
-                        existing_student.conversation_turns = student_data['progress'].get('conversation_turns', 0)
-                        existing_student.current_score = student_data['progress'].get('current_score', 0)
-
-                        # Update dimension scores
-                        dimensions = student_data['progress'].get('dimensions', {})
-                        existing_student.depth_score = dimensions.get('depth', 0)
-                        existing_student.breadth_score = dimensions.get('breadth', 0)
-                        existing_student.application_score = dimensions.get('application', 0)
-                        existing_student.metacognition_score = dimensions.get('metacognition', 0)
-                        existing_student.engagement_score = dimensions.get('engagement', 0)
-
-                        existing_student.is_completed = student_data['progress'].get('is_completed', False)
-                        existing_student.completed_at = self._parse_datetime(student_data['progress'].get('completed_at'))
-                    else:
-                        # Create new student
-                        new_student = Student(
-                            id=student_id,
-                            session_id=session_id,
-                            name=student_data.get('name', '익명'),
-                            token=student_data.get('token'),  # Include token
-                            joined_at=self._parse_datetime(student_data.get('joined_at')),
-                            last_active=self._parse_datetime(student_data.get('last_active')),
-                            conversation_turns=student_data['progress'].get('conversation_turns', 0),
-                            current_score=student_data['progress'].get('current_score', 0),
-                            depth_score=student_data['progress'].get('dimensions', {}).get('depth', 0),
-                            breadth_score=student_data['progress'].get('dimensions', {}).get('breadth', 0),
-                            application_score=student_data['progress'].get('dimensions', {}).get('application', 0),
-                            metacognition_score=student_data['progress'].get('dimensions', {}).get('metacognition', 0),
-                            engagement_score=student_data['progress'].get('dimensions', {}).get('engagement', 0),
-                            is_completed=student_data['progress'].get('is_completed', False),
-                            completed_at=self._parse_datetime(student_data['progress'].get('completed_at'))
-                        )
-                        db_session.add(new_student)
-
-                    # Save messages
-                    await self._save_student_messages(db_session, student_id, session_id, student_data.get('messages', []))
+                    progress = student_data['progress']
+                    dimensions = progress.get('dimensions', {})
+                    rows.append({
+                        'id': student_id,
+                        'session_id': session_id,
+                        'name': student_data.get('name', '익명'),
+                        'token': student_data.get('token'),
+                        'joined_at': self._parse_datetime(student_data.get('joined_at')) or now,
+                        'last_active': self._parse_datetime(student_data.get('last_active')) or now,
+                        'conversation_turns': progress.get('conversation_turns', 0),
+                        'current_score': progress.get('current_score', 0),
+                        'depth_score': dimensions.get('depth', 0),
+                        'breadth_score': dimensions.get('breadth', 0),
+                        'application_score': dimensions.get('application', 0),
+                        'metacognition_score': dimensions.get('metacognition', 0),
+                        'engagement_score': dimensions.get('engagement', 0),
+                        'is_completed': progress.get('is_completed', False),
+                        'completed_at': self._parse_datetime(progress.get('completed_at'))
+                    })
+
+                # One statement for all students: insert new ones, update the rest in place
+                insert = pg_insert if db_session.bind.dialect.name == "postgresql" else sqlite_insert
+                upsert_stmt = insert(Student).values(rows)
+                upsert_stmt = upsert_stmt.on_conflict_do_update(
+                    index_elements=[Student.id],
+                    set_={
+                        column: upsert_stmt.excluded[column]
+                        for column in rows[0]
+                        if column not in ('id', 'session_id', 'joined_at')
+                    }
+                )
+                await db_session.execute(upsert_stmt)
+
+                # Save messages
+                await self._save_student_messages(db_session, session_id, session_students)
 
                 await db_session.commit()
+                self._invalidate_live_stats(session_id)
                 return True
         except Exception as e:
-            print(f"Error saving students for session {session_id}: {e}")
+            logger.error("Error saving students for session %s: %s", session_id, e)
             return False
 
     async def load_students(self) -> Dict[str, Any]:
         """Load all student data from database."""
         try:
-            async with await self._get_session() as session:
-                stmt = select(Student).options(selectinload(Student.messages))
-                result = await session.execute(stmt)
-                db_students = result.scalars().all()
+            async with self._get_session() as session:
+                # Plain column rows (no ORM entities), conversation joined in (at most one per student),
+                # trimmed to its newest LOAD_STUDENTS_MESSAGE_LIMIT entries before it leaves the database
+                stmt = select(
+                    Student.id, Student.name, Student.session_id, Student.token,
+                    Student.joined_at, Student.last_active,
+                    Student.conversation_turns, Student.current_score,
+                    Student.depth_score, Student.breadth_score, Student.application_score,
+                    Student.metacognition_score, Student.engagement_score,
+                    Student.is_completed, Student.completed_at,
+                    json_array_tail(
+                        Message.conversation_data, LOAD_STUDENTS_MESSAGE_LIMIT
+                    ).label('conversation_data')
+                ).outerjoin(Message, Message.student_id == Student.id)
+                # Stream in chunks instead of materializing every row at once
+                result = await session.stream(stmt.execution_options(yield_per=200))
 
                 students_dict = {}
-                for student in db_students:
+                async for student in result:
                     session_id = student.session_id
                     if session_id not in students_dict:
                         students_dict[session_id] = {}
@@ -227,142 +364,199 @@ class DatabaseService:
                             'is_completed': student.is_completed,
                             'completed_at': student.completed_at.isoformat() if student.completed_at else None
                         },
+                        # One conversation row per student (unique student_id): nothing to sort, newest entry first
                         'messages': [
                             {
-                                'content': msg.content,
-                                'timestamp': msg.timestamp.isoformat(),
-                                'type': msg.message_type
+                                'content': entry.get('content', ''),
+                                'timestamp': None,  # No individual timestamps in JSON storage
+                                'type': entry.get('role', 'user')
                             }
-                            for msg in sorted(student.messages, key=lambda x: x.timestamp, reverse=True)
+                            for entry in reversed(student.conversation_data or [])
                         ]
                     }
 
                 return students_dict
         except Exception as e:
-            print(f"Error loading students: {e}")
+            logger.error("Error loading students: %s", e)
             return {}
 
     async def delete_session(self, session_id: str) -> bool:
         """Soft delete a session (mark as deleted but keep data)."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 stmt = update(Session).where(Session.id == session_id).values(
-                    deleted_at=datetime.now(self.kst)
+                    deleted_at=func.now()
                 )
                 result = await session.execute(stmt)
                 await session.commit()
                 return result.rowcount > 0
         except Exception as e:
-            print(f"Error soft deleting session {session_id}: {e}")
+            logger.error("Error soft deleting session %s: %s", session_id, e)
             return False
 
     async def hard_delete_session(self, session_id: str) -> bool:
         """Hard delete a session from database (permanent removal)."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 stmt = delete(Session).where(Session.id == session_id)
                 await session.execute(stmt)
                 await session.commit()
                 return True
         except Exception as e:
-            print(f"Error hard deleting session {session_id}: {e}")
+            logger.error("Error hard deleting session %s: %s", session_id, e)
             return False
 
-    async def _save_student_messages(self, db_session: AsyncSession, student_id: str, session_id: str, messages: List[Dict]):
+    async def _save_student_messages(self, db_session: AsyncSession, session_id: str, session_students: Dict[str, Any]):
         """Save student messages to database without deleting existing ones."""
         # DO NOT DELETE existing messages - they should persist
         # Only add new messages that don't already exist
-
-        # Add new messages (skip if content already exists to avoid duplicates)
-        for msg in messages:
-            content = msg.get('content', '')
-            if content:  # Only save non-empty messages
-                # Check if message already exists
-                existing_stmt = select(Message).where(
-                    Message.student_id == student_id,
-                    Message.content == content,
-                    Message.message_type == msg.get('type', 'user')
-                )
-                existing = await db_session.execute(existing_stmt)
-                if existing.scalar_one_or_none() is None:
-                    # Message doesn't exist, create new one
-                    new_message = Message(
-                        student_id=student_id,
-                        session_id=session_id,
-                        content=content,
-                        message_type=msg.get('type', 'user'),
-                        timestamp=self._parse_datetime(msg.get('timestamp'))
-                    )
-                    db_session.add(new_message)
+        incoming = {
+            student_id: [
+                {"role": msg.get('type', 'user'), "content": msg['content']}
+                for msg in student_data.get('messages', [])
+                if msg.get('content')  # Only save non-empty messages
+            ]
+            for student_id, student_data in session_students.items()
+        }
+        incoming = {student_id: entries for student_id, entries in incoming.items() if entries}
+        if not incoming:
+            return
+
+        # Load every existing conversation in one query
+        result = await db_session.execute(
+            select(Message.student_id, Message.conversation_data).where(Message.student_id.in_(incoming))
+        )
+        existing = {student_id: conversation for student_id, conversation in result.all()}
+
+        rows = []
+        for student_id, entries in incoming.items():
+            conversation = list(existing.get(student_id) or [])
+            # Skip if content already exists to avoid duplicates
+            seen = {(entry.get("role"), entry.get("content")) for entry in conversation}
+            new_entries = []
+            for entry in entries:
+                key = (entry["role"], entry["content"])
+                if key not in seen:
+                    seen.add(key)
+                    new_entries.append(entry)
+            if not new_entries:
+                continue  # Unchanged history: leave the row alone
+            conversation.extend(new_entries)
+            rows.append({
+                'student_id': student_id,
+                'session_id': session_id,
+                'conversation_data': conversation
+            })
+        if not rows:
+            return
+
+        insert = pg_insert if db_session.bind.dialect.name == "postgresql" else sqlite_insert
+        upsert_stmt = insert(Message).values(rows)
+        upsert_stmt = upsert_stmt.on_conflict_do_update(
+            index_elements=[Message.student_id],
+            set_={"conversation_data": upsert_stmt.excluded.conversation_data}
+        )
+        await db_session.execute(upsert_stmt)
 
     async def _calculate_live_stats(self, session_id: str) -> Dict[str, Any]:
         """Calculate live statistics for a session."""
         try:
-            async with await self._get_session() as session:
-                # Count students
-                stmt = select(func.count(Student.id)).where(Student.session_id == session_id)
-                result = await session.execute(stmt)
-                total_joined = result.scalar() or 0
-
-                # Count completed students
-                stmt = select(func.count(Student.id)).where(
-                    and_(Student.session_id == session_id, Student.is_completed == True)
-                )
-                result = await session.execute(stmt)
-                completed_count = result.scalar() or 0
-
-                # Calculate averages
-                stmt = select(
-                    func.avg(Student.current_score),
-                    func.avg(Student.depth_score),
-                    func.avg(Student.breadth_score),
-                    func.avg(Student.application_score),
-                    func.avg(Student.metacognition_score),
-                    func.avg(Student.engagement_score)
-                ).where(Student.session_id == session_id)
-                result = await session.execute(stmt)
-                averages = result.first()
+            async with self._get_session() as session:
+                live_stats = await self._calculate_live_stats_bulk(session, [session_id])
+                return live_stats[session_id]
+        except Exception as e:
+            logger.error("Error calculating live stats for session %s: %s", session_id, e)
+            return self._build_live_stats(0, 0, None)
 
-                return {
-                    'current_students': total_joined,
-                    'total_joined': total_joined,
-                    'average_score': float(averages[0] or 0),
-                    'completion_rate': (completed_count / max(total_joined, 1)) * 100,
-                    'dimension_averages': {
-                        'depth': float(averages[1] or 0),
-                        'breadth': float(averages[2] or 0),
-                        'application': float(averages[3] or 0),
-                        'metacognition': float(averages[4] or 0),
-                        'engagement': float(averages[5] or 0)
-                    },
-                    'recent_activities': []
-                }
+    async def _calculate_live_stats_for_sessions(self, session_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Calculate live statistics for several sessions in one round trip."""
+        try:
+            async with self._get_session() as session:
+                return await self._calculate_live_stats_bulk(session, session_ids)
         except Exception as e:
-            print(f"Error calculating live stats for session {session_id}: {e}")
-            return {
-                'current_students': 0,
-                'total_joined': 0,
-                'average_score': 0.0,
-                'completion_rate': 0.0,
-                'dimension_averages': {
-                    'depth': 0.0,
-                    'breadth': 0.0,
-                    'application': 0.0,
-                    'metacognition': 0.0,
-                    'engagement': 0.0
-                },
-                'recent_activities': []
-            }
+            logger.error("Error calculating live stats for sessions: %s", e)
+            return {session_id: self._build_live_stats(0, 0, None) for session_id in session_ids}
+
+    async def _calculate_live_stats_bulk(self, session: AsyncSession, session_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Calculate live statistics for several sessions with one GROUP BY query."""
+        now = time.monotonic()
+        rows = {}
+        missing = []
+        for session_id in session_ids:
+            cached = self._live_stats_cache.get(session_id)
+            if cached is not None and now - cached[0] < LIVE_STATS_TTL_SECONDS:
+                rows[session_id] = cached[1]
+            else:
+                missing.append(session_id)
+        self._live_stats_hits += len(session_ids) - len(missing)
+        self._live_stats_misses += len(missing)
+
+        if missing:
+            stmt = lambda_stmt(lambda: select(
+                Student.session_id,
+                func.count(Student.id),
+                func.sum(case((Student.is_completed == True, 1), else_=0)),
+                func.avg(Student.current_score),
+                func.avg(Student.depth_score),
+                func.avg(Student.breadth_score),
+                func.avg(Student.application_score),
+                func.avg(Student.metacognition_score),
+                func.avg(Student.engagement_score)
+            ).where(Student.session_id.in_(missing)).group_by(Student.session_id))
+            result = await session.execute(stmt)
+            fetched = {row[0]: tuple(row[1:]) for row in result.all()}
+
+            for session_id in missing:
+                rows[session_id] = fetched.get(session_id)
+                self._live_stats_cache[session_id] = (now, rows[session_id])
+                self._live_stats_cache.move_to_end(session_id)
+            while len(self._live_stats_cache) > LIVE_STATS_CACHE_SIZE:
+                self._live_stats_cache.popitem(last=False)
+
+        live_stats = {}
+        for session_id in session_ids:
+            row = rows[session_id]
+            if row is None:
+                live_stats[session_id] = self._build_live_stats(0, 0, None)
+            else:
+                live_stats[session_id] = self._build_live_stats(row[0], row[1] or 0, row[2:])
+        return live_stats
+
+    def _invalidate_live_stats(self, session_id: str):
+        """Drop a session's cached live stats after its students change."""
+        self._live_stats_cache.pop(session_id, None)
+
+    def _build_live_stats(self, total_joined: int, completed_count: int, averages) -> Dict[str, Any]:
+        """Shape live statistics from student counts and score averages."""
+        averages = averages or (None,) * 6
+        return {
+            'current_students': total_joined,
+            'total_joined': total_joined,
+            'average_score': float(averages[0] or 0),
+            'completion_rate': (completed_count / max(total_joined, 1)) * 100,
+            'dimension_averages': {
+                'depth': float(averages[1] or 0),
+                'breadth': float(averages[2] or 0),
+                'application': float(averages[3] or 0),
+                'metacognition': float(averages[4] or 0),
+                'engagement': float(averages[5] or 0)
+            },
+            'recent_activities': []
+        }
 
     def _parse_datetime(self, dt_str: str) -> Optional[datetime]:
         """Parse datetime string to datetime object."""
         if not dt_str:
             return None
-        try:
-            if isinstance(dt_str, str):
-                return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+        if not isinstance(dt_str, str):
             return dt_str
-        except Exception:
+        try:
+            return datetime.fromisoformat(dt_str)  # Python 3.11+ accepts a trailing 'Z'
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+        except ValueError:
             return None
 
     def _format_korea_time(self, dt: datetime) -> str:
@@ -372,10 +566,10 @@ class DatabaseService:
         try:
             # If datetime is naive (no timezone), assume it's UTC
             if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=pytz.UTC)
+                dt = dt.replace(tzinfo=timezone.utc)
 
             # Convert to Korean timezone
-            korea_time = dt.astimezone(self.kst)
+            korea_time = dt.astimezone(KST)
             return korea_time.isoformat()
         except Exception:
             # Fallback to original isoformat
@@ -384,7 +578,7 @@ class DatabaseService:
     async def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 # Count total sessions
                 stmt = select(func.count(Session.id))
                 result = await session.execute(stmt)
@@ -399,17 +593,27 @@ class DatabaseService:
                     "total_sessions": total_sessions,
                     "total_students": total_students,
                     "storage_type": "database",
-                    "data_directory": "N/A (Database)"
+                    "data_directory": "N/A (Database)",
+                    "live_stats_cache": self._live_stats_cache_stats()
                 }
         except Exception as e:
-            print(f"Error getting storage stats: {e}")
+            logger.error("Error getting storage stats: %s", e)
             return {
                 "total_sessions": 0,
                 "total_students": 0,
                 "storage_type": "database",
-                "data_directory": "N/A (Database)"
+                "data_directory": "N/A (Database)",
+                "live_stats_cache": self._live_stats_cache_stats()
             }
 
+    def _live_stats_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters for the live stats cache."""
+        return {
+            "hits": self._live_stats_hits,
+            "misses": self._live_stats_misses,
+            "size": len(self._live_stats_cache)
+        }
+
     async def is_database_enabled(self) -> bool:
         """Check if database is enabled."""
         return True  # DatabaseService is always database-enabled
@@ -417,70 +621,78 @@ class DatabaseService:
     async def save_message(self, session_id: str, student_id: str, content: str, message_type: str) -> bool:
         """Append message to conversation_data JSON array in messages table."""
         try:
-            print(f"🔍 Saving message to conversation_data: session={session_id}, student={student_id}, type={message_type}")
+            logger.debug(
+                "🔍 Saving message to conversation_data: session=%s, student=%s, type=%s",
+                session_id, student_id, message_type
+            )
 
             async with AsyncSessionLocal() as db_session:
                 async with db_session.begin():
-                    # Check if message record exists for this student
-                    message_stmt = select(Message).where(Message.student_id == student_id, Message.session_id == session_id)
-                    message_result = await db_session.execute(message_stmt)
-                    message_record = message_result.scalar_one_or_none()
-
                     new_message_entry = {
                         "role": message_type,
                         "content": content
                     }
 
-                    if message_record:
-                        # Append to existing conversation_data
-                        conversation_data = message_record.conversation_data or []
-                        conversation_data.append(new_message_entry)
-                        message_record.conversation_data = conversation_data
-                        # IMPORTANT: Mark the JSON field as modified for SQLAlchemy to detect changes
-                        flag_modified(message_record, "conversation_data")
-                        message_record.timestamp = datetime.now(self.kst)
-                        print(f"✅ Appended message to existing conversation (total: {len(conversation_data)} messages)")
-                    else:
-                        # Create new message record with first message
-                        new_message_record = Message(
-                            student_id=student_id,
-                            session_id=session_id,
-                            conversation_data=[new_message_entry],
-                            timestamp=datetime.now(self.kst)
-                        )
-                        db_session.add(new_message_record)
-                        print(f"✅ Created new message record for student")
-
-                    await db_session.flush()
-
-                print(f"✅ Message saved successfully")
+                    # One statement: insert the first turn, or append inside the database on later turns.
+                    # timestamp comes from the server default on insert and func.now() on append.
+                    insert = pg_insert if db_session.bind.dialect.name == "postgresql" else sqlite_insert
+                    upsert_stmt = insert(Message).values(
+                        student_id=student_id,
+                        session_id=session_id,
+                        conversation_data=[new_message_entry]
+                    )
+                    upsert_stmt = upsert_stmt.on_conflict_do_update(
+                        index_elements=[Message.student_id],
+                        set_={
+                            "conversation_data": json_array_append(
+                                Message.conversation_data,
+                                orjson.dumps(new_message_entry).decode()
+                            ),
+                            "timestamp": func.now()
+                        }
+                    ).returning(Message.turn_count)
+                    turn_count = (await db_session.execute(upsert_stmt)).scalar_one()
+
+                    logger.debug("✅ Saved message to conversation (total: %s messages)", turn_count)
+
+                logger.debug("✅ Message saved successfully")
                 return True
 
         except Exception as e:
-            print(f"❌ Error saving message: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error saving message: %s", e)
             return False
 
-    async def get_student_messages(self, session_id: str, student_id: str) -> List[Dict[str, Any]]:
-        """Get conversation_data from messages table."""
+    async def get_student_messages(
+        self, session_id: str, student_id: str, limit: Optional[int] = None,
+        db_session: Optional[AsyncSession] = None
+    ) -> List[Dict[str, Any]]:
+        """Get conversation_data from messages table (only the latest `limit` entries if given)."""
         try:
-            print(f"🔍 Getting conversation_data for session={session_id}, student={student_id}")
-
-            async with AsyncSessionLocal() as db_session:
-                # Get message record for this student
-                message_stmt = select(Message).where(Message.student_id == student_id, Message.session_id == session_id)
+            logger.debug("🔍 Getting conversation_data for session=%s, student=%s", session_id, student_id)
+
+            async with self._scope(db_session) as db_session:
+                # Get conversation_data for this student (lambda_stmt: built and compiled once per process).
+                # With a limit the array is sliced in the database, so only the tail crosses the wire.
+                if limit is None:
+                    message_stmt = lambda_stmt(lambda: select(Message.conversation_data).where(
+                        Message.student_id == student_id, Message.session_id == session_id
+                    ))
+                else:
+                    message_stmt = lambda_stmt(lambda: select(
+                        json_array_tail(Message.conversation_data, limit)
+                    ).where(
+                        Message.student_id == student_id, Message.session_id == session_id
+                    ))
                 message_result = await db_session.execute(message_stmt)
-                message_record = message_result.scalar_one_or_none()
+                message_record = message_result.one_or_none()
 
                 if not message_record:
-                    print(f"ℹ️ No message record found for student {student_id}")
+                    logger.debug("ℹ️ No message record found for student %s", student_id)
                     return []
 
-                # Get conversation_data
-                conversation_data = message_record.conversation_data or []
+                conversation_data = message_record[0] or []
 
-                print(f"✅ Loaded {len(conversation_data)} messages from conversation_data")
+                logger.debug("✅ Loaded %s messages from conversation_data", len(conversation_data))
 
                 # Convert to expected format (role → message_type for compatibility)
                 result_list = [
@@ -495,36 +707,47 @@ class DatabaseService:
                 return result_list
 
         except Exception as e:
-            print(f"❌ Error getting student messages: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error getting student messages: %s", e)
             return []
 
-    async def get_session_messages(self, session_id: str) -> List[Dict[str, Any]]:
-        """Get all messages for a session with student info, ordered by timestamp (newest first)."""
+    async def get_session_messages(
+        self, session_id: str, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get messages for a session with student info, newest first (at most `limit` if given)."""
         try:
-            async with await self._get_session() as session:
-                stmt = select(Message, Student.name).join(
+            async with self._get_session() as session:
+                # Only the columns we return; idx_messages_session_timestamp serves the filter and ordering.
+                # With a limit, no more than `limit` conversations are read and each is sliced in the database.
+                conversation_data = Message.conversation_data
+                if limit is not None:
+                    conversation_data = json_array_tail(Message.conversation_data, limit)
+                stmt = select(
+                    Message.student_id, conversation_data, Student.name
+                ).join(
                     Student, Message.student_id == Student.id
                 ).where(
                     Message.session_id == session_id
                 ).order_by(Message.timestamp.desc())
+                if limit is not None:
+                    stmt = stmt.limit(limit)
 
                 result = await session.execute(stmt)
-                message_student_pairs = result.all()
 
-                return [
+                # Most recently active conversation first, newest entry first within it
+                messages = [
                     {
-                        "content": msg.content,
-                        "message_type": msg.message_type,
-                        "timestamp": self._format_korea_time(msg.timestamp) if msg.timestamp else None,
-                        "student_id": msg.student_id,
+                        "content": entry.get("content", ""),
+                        "message_type": entry.get("role", "user"),
+                        "timestamp": None,  # No individual timestamps in JSON storage
+                        "student_id": student_id,
                         "student_name": student_name
                     }
-                    for msg, student_name in message_student_pairs
+                    for student_id, conversation_data, student_name in result.all()
+                    for entry in reversed(conversation_data or [])
                 ]
+                return messages if limit is None else messages[:limit]
         except Exception as e:
-            print(f"Error getting session messages: {e}")
+            logger.error("Error getting session messages: %s", e)
             return []
 
     async def save_score(
@@ -538,171 +761,179 @@ class DatabaseService:
         is_completed: bool = False
     ) -> bool:
         """Save a score record for a student response."""
+        return await self.save_scores([{
+            'message_id': message_id,
+            'student_id': student_id,
+            'session_id': session_id,
+            'overall_score': overall_score,
+            'depth_score': dimensions.get('depth', 0),
+            'breadth_score': dimensions.get('breadth', 0),
+            'application_score': dimensions.get('application', 0),
+            'metacognition_score': dimensions.get('metacognition', 0),
+            'engagement_score': dimensions.get('engagement', 0),
+            'evaluation_data': evaluation_data,
+            'is_completed': is_completed
+        }])
+
+    async def save_scores(self, rows: List[Dict[str, Any]]) -> bool:
+        """Insert score records (dicts keyed by Score column) in one multi-row INSERT."""
+        if not rows:
+            return True
         try:
-            async with await self._get_session() as session:
-                new_score = Score(
-                    message_id=message_id,
-                    student_id=student_id,
-                    session_id=session_id,
-                    overall_score=overall_score,
-                    depth_score=dimensions.get('depth', 0),
-                    breadth_score=dimensions.get('breadth', 0),
-                    application_score=dimensions.get('application', 0),
-                    metacognition_score=dimensions.get('metacognition', 0),
-                    engagement_score=dimensions.get('engagement', 0),
-                    evaluation_data=evaluation_data,
-                    is_completed=is_completed,
-                    created_at=datetime.now(self.kst)
-                )
-                session.add(new_score)
+            async with self._get_session() as session:
+                # Core insert: no ORM instance or unit-of-work flush per score
+                insert = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+                await session.execute(insert(Score).values(rows))
                 await session.commit()
                 return True
         except Exception as e:
-            print(f"Error saving score: {e}")
+            logger.error("Error saving scores: %s", e)
             return False
 
     async def get_student_scores(self, session_id: str, student_id: str) -> List[Dict[str, Any]]:
         """Get all score records for a specific student in a session."""
+        scores = await self.get_scores_for_students(session_id, [student_id])
+        return scores.get(student_id, [])
+
+    async def get_scores_for_students(
+        self, session_id: str, student_ids: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get score records for several students of a session in one query, keyed by student_id."""
+        scores: Dict[str, List[Dict[str, Any]]] = {student_id: [] for student_id in student_ids}
+        if not scores:
+            return scores
         try:
-            async with await self._get_session() as session:
-                stmt = select(Score).where(
-                    and_(Score.session_id == session_id, Score.student_id == student_id)
+            async with self._get_session() as session:
+                # Plain column rows: no ORM identity map or instance state per score
+                stmt = select(*SCORE_COLUMNS, Score.student_id).where(
+                    and_(Score.session_id == session_id, Score.student_id.in_(list(scores)))
                 ).order_by(Score.created_at.desc())
 
                 result = await session.execute(stmt)
-                scores = result.scalars().all()
-
-                return [
-                    {
-                        "id": score.id,
-                        "message_id": score.message_id,
-                        "overall_score": score.overall_score,
-                        "dimensions": {
-                            "depth": score.depth_score,
-                            "breadth": score.breadth_score,
-                            "application": score.application_score,
-                            "metacognition": score.metacognition_score,
-                            "engagement": score.engagement_score
-                        },
-                        "evaluation_data": score.evaluation_data,
-                        "is_completed": score.is_completed,
-                        "created_at": self._format_korea_time(score.created_at) if score.created_at else None
-                    }
-                    for score in scores
-                ]
+                for row in result:
+                    scores[row.student_id].append(self._score_row_to_dict(row))
+                return scores
         except Exception as e:
-            print(f"Error getting student scores: {e}")
-            return []
+            logger.error("Error getting student scores: %s", e)
+            return {student_id: [] for student_id in student_ids}
 
     async def get_session_scores(self, session_id: str) -> List[Dict[str, Any]]:
         """Get all score records for a session."""
         try:
-            async with await self._get_session() as session:
-                stmt = select(Score, Student.name).join(
+            async with self._get_session() as session:
+                stmt = select(*SCORE_COLUMNS, Score.student_id, Student.name).join(
                     Student, Score.student_id == Student.id
                 ).where(
                     Score.session_id == session_id
                 ).order_by(Score.created_at.desc())
 
                 result = await session.execute(stmt)
-                score_student_pairs = result.all()
-
                 return [
                     {
-                        "id": score.id,
-                        "message_id": score.message_id,
-                        "student_id": score.student_id,
-                        "student_name": student_name,
-                        "overall_score": score.overall_score,
-                        "dimensions": {
-                            "depth": score.depth_score,
-                            "breadth": score.breadth_score,
-                            "application": score.application_score,
-                            "metacognition": score.metacognition_score,
-                            "engagement": score.engagement_score
-                        },
-                        "evaluation_data": score.evaluation_data,
-                        "is_completed": score.is_completed,
-                        "created_at": self._format_korea_time(score.created_at) if score.created_at else None
+                        **self._score_row_to_dict(row),
+                        "student_id": row.student_id,
+                        "student_name": row.name
                     }
-                    for score, student_name in score_student_pairs
+                    for row in result
                 ]
         except Exception as e:
-            print(f"Error getting session scores: {e}")
+            logger.error("Error getting session scores: %s", e)
             return []
 
-    async def get_session_by_id(self, session_id: str) -> Optional[Session]:
+    def _score_row_to_dict(self, row) -> Dict[str, Any]:
+        """Build the API dict for one row selected with SCORE_COLUMNS."""
+        return {
+            "id": row.id,
+            "message_id": row.message_id,
+            "overall_score": row.overall_score,
+            "dimensions": {
+                "depth": row.depth_score,
+                "breadth": row.breadth_score,
+                "application": row.application_score,
+                "metacognition": row.metacognition_score,
+                "engagement": row.engagement_score
+            },
+            "evaluation_data": row.evaluation_data,
+            "is_completed": row.is_completed,
+            "created_at": self._format_korea_time(row.created_at) if row.created_at else None
+        }
+
+    async def get_session_by_id(
+        self, session_id: str, db_session: Optional[AsyncSession] = None
+    ) -> Optional[Session]:
         """Get a session by ID."""
         try:
-            async with await self._get_session() as session:
-                stmt = select(Session).options(selectinload(Session.teacher)).where(
+            async with self._scope(db_session) as session:
+                stmt = select(Session).options(joinedload(Session.teacher)).where(
                     and_(Session.id == session_id, Session.deleted_at.is_(None))
                 )
                 result = await session.execute(stmt)
                 return result.scalar_one_or_none()
         except Exception as e:
-            print(f"Error getting session {session_id}: {e}")
+            logger.error("Error getting session %s: %s", session_id, e)
             return None
 
     async def get_student_by_token(self, session_id: str, token: str) -> Optional[Student]:
         """Get a student by token in a specific session."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 stmt = select(Student).where(
                     and_(Student.session_id == session_id, Student.token == token)
                 )
                 result = await session.execute(stmt)
                 return result.scalar_one_or_none()
         except Exception as e:
-            print(f"Error getting student by token: {e}")
+            logger.error("Error getting student by token: %s", e)
             return None
 
     async def get_student_by_name(self, session_id: str, name: str) -> Optional[Student]:
         """Get a student by name in a specific session."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 stmt = select(Student).where(
                     and_(Student.session_id == session_id, func.lower(Student.name) == name.lower())
                 )
                 result = await session.execute(stmt)
                 return result.scalar_one_or_none()
         except Exception as e:
-            print(f"Error getting student by name: {e}")
+            logger.error("Error getting student by name: %s", e)
             return None
 
-    async def get_student_by_id(self, student_id: str) -> Optional[Student]:
+    async def get_student_by_id(
+        self, student_id: str, db_session: Optional[AsyncSession] = None
+    ) -> Optional[Student]:
         """Get a student by ID."""
         try:
-            async with await self._get_session() as session:
-                stmt = select(Student).where(Student.id == student_id)
+            async with self._scope(db_session) as session:
+                stmt = lambda_stmt(lambda: select(Student).where(Student.id == student_id))
                 result = await session.execute(stmt)
                 return result.scalar_one_or_none()
         except Exception as e:
-            print(f"Error getting student by ID: {e}")
+            logger.error("Error getting student by ID: %s", e)
             return None
 
     async def get_students_by_session(self, session_id: str) -> List[Student]:
         """Get all students in a session."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 stmt = select(Student).where(Student.session_id == session_id).order_by(Student.joined_at)
                 result = await session.execute(stmt)
                 return result.scalars().all()
         except Exception as e:
-            print(f"Error getting students for session {session_id}: {e}")
+            logger.error("Error getting students for session %s: %s", session_id, e)
             return []
 
     async def get_message_count(self, student_id: str, message_type: str = 'user') -> int:
         """Get count of messages for a student by type."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 stmt = select(func.count(Message.id)).where(
                     and_(Message.student_id == student_id, Message.message_type == message_type)
                 )
                 result = await session.execute(stmt)
                 return result.scalar() or 0
         except Exception as e:
-            print(f"Error getting message count: {e}")
+            logger.error("Error getting message count: %s", e)
             return 0
 
     async def update_student_progress(
@@ -714,7 +945,7 @@ class DatabaseService:
     ) -> bool:
         """Update student progress in database."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 stmt = select(Student).where(Student.id == student_id)
                 result = await session.execute(stmt)
                 student = result.scalar_one_or_none()
@@ -723,7 +954,8 @@ class DatabaseService:
                     return False
 
                 # Update student fields
-                student.last_active = datetime.now(self.kst)
+                now = datetime.now(KST)
+                student.last_active = now
                 student.current_score = understanding_score
                 student.conversation_turns += 1
                 student.depth_score = dimensions.get('depth', 0)
@@ -734,12 +966,13 @@ class DatabaseService:
 
                 if is_completed and not student.is_completed:
                     student.is_completed = True
-                    student.completed_at = datetime.now(self.kst)
+                    student.completed_at = now
 
                 await session.commit()
+                self._invalidate_live_stats(student.session_id)
                 return True
         except Exception as e:
-            print(f"Error updating student progress: {e}")
+            logger.error("Error updating student progress: %s", e)
             return False
 
     async def create_student(
@@ -751,14 +984,15 @@ class DatabaseService:
     ) -> Optional[Student]:
         """Create a new student."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
+                now = datetime.now(KST)
                 new_student = Student(
                     id=student_id,
                     session_id=session_id,
                     name=name,
                     token=token,
-                    joined_at=datetime.now(self.kst),
-                    last_active=datetime.now(self.kst),
+                    joined_at=now,
+                    last_active=now,
                     conversation_turns=0,
                     current_score=0,
                     depth_score=0,
@@ -770,30 +1004,31 @@ class DatabaseService:
                 )
                 session.add(new_student)
                 await session.commit()
+                self._invalidate_live_stats(session_id)
                 await session.refresh(new_student)
                 return new_student
         except Exception as e:
-            print(f"Error creating student: {e}")
+            logger.error("Error creating student: %s", e)
             return None
 
     async def update_student_last_active(self, student_id: str) -> bool:
         """Update student's last active timestamp."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 stmt = update(Student).where(Student.id == student_id).values(
-                    last_active=datetime.now(self.kst)
+                    last_active=datetime.now(KST)
                 )
                 await session.execute(stmt)
                 await session.commit()
                 return True
         except Exception as e:
-            print(f"Error updating student last active: {e}")
+            logger.error("Error updating student last active: %s", e)
             return False
 
     async def get_sessions_by_teacher(self, teacher_fingerprint: str) -> List[Session]:
         """Get all non-deleted sessions for a teacher."""
         try:
-            async with await self._get_session() as session:
+            async with self._get_session() as session:
                 # First get teacher
                 teacher_stmt = select(Teacher).where(Teacher.fingerprint == teacher_fingerprint)
                 teacher_result = await session.execute(teacher_stmt)
@@ -803,72 +1038,34 @@ class DatabaseService:
                     return []
 
                 # Get sessions
-                stmt = select(Session).where(
+                stmt = select(Session).options(selectinload(Session.teacher)).where(
                     and_(Session.teacher_id == teacher.id, Session.deleted_at.is_(None))
                 ).order_by(Session.created_at.desc())
                 result = await session.execute(stmt)
                 return result.scalars().all()
         except Exception as e:
-            print(f"Error getting sessions for teacher: {e}")
+            logger.error("Error getting sessions for teacher: %s", e)
             return []
 
 
 
 
 
-    def _update_topic_fields(self, session, config: Dict[str, Any]):
-        """Update enhanced topic tracking fields from session config."""
-        # Determine topic type and source
+    def _topic_fields(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Build enhanced topic tracking column values from session config."""
+        # Map source types to our enhanced classification (unknown types fall back to manual)
         source_type = config.get('source_type', 'manual')
-
-        # Map source types to our enhanced classification
-        if source_type == 'manual':
-            session.topic_type = 'manual'
-            session.topic_source = 'manual'
-            session.manual_topic_content = config.get('manual_content') or config.get('topic')
-            session.final_topic_content = config.get('combined_topic') or config.get('topic')
-        elif source_type == 'pdf':
-            # Determine which PDF variant based on what's available
-            if config.get('pdf_content'):
-                # Check if it's the compressed content (longer) or others
-                pdf_content = config.get('pdf_content', '')
-                if len(pdf_content) > 500:  # Likely the compressed content (요약 줄글)
-                    session.topic_type = 'pdf_summary'
-                    session.pdf_summary_topic = pdf_content
-                elif len(pdf_content) < 50:  # Likely noun topic (명사형)
-                    session.topic_type = 'pdf_noun'
-                    session.pdf_noun_topic = pdf_content
-                else:  # Likely sentence topic (한 문장)
-                    session.topic_type = 'pdf_sentence'
-                    session.pdf_sentence_topic = pdf_content
-            else:
-                session.topic_type = 'pdf_summary'  # Default fallback
-
-            session.topic_source = 'pdf'
-            session.pdf_original_content = config.get('original_text')
-            session.final_topic_content = config.get('combined_topic') or config.get('topic')
-        elif source_type == 'hybrid':
-            session.topic_type = 'hybrid'
-            session.topic_source = 'hybrid'
-            session.pdf_summary_topic = config.get('pdf_content')
-            session.manual_topic_content = config.get('manual_content')
-            session.final_topic_content = config.get('combined_topic') or config.get('topic')
-        else:
-            # Fallback to manual
-            session.topic_type = 'manual'
-            session.topic_source = 'manual'
-            session.manual_topic_content = config.get('topic')
-            session.final_topic_content = config.get('topic')
+        fields = TOPIC_FIELD_BUILDERS.get(source_type, _fallback_topic_fields)(config)
 
         # Store additional metadata
-        session.topic_metadata = {
+        fields['topic_metadata'] = {
             'source_type': source_type,
             'key_concepts': config.get('key_concepts', []),
             'learning_objectives': config.get('learning_objectives', []),
             'main_keyword': config.get('main_keyword'),
-            'processing_timestamp': datetime.now(self.kst).isoformat()
+            'processing_timestamp': datetime.now(KST).isoformat()
         }
-
+        return fields
 
 # Singleton instance
 _database_service = DatabaseService()
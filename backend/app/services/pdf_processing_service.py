@@ -10,6 +10,10 @@ from app.models.pdf_models import PdfAnalysisResult
 
 logger = logging.getLogger(__name__)
 
+_NEWLINES_RE = re.compile(r'\n+')
+_SPACES_RE = re.compile(r'[ \t]+')
+_READABLE_CHAR_RE = re.compile(r'[가-힣a-zA-Z]')  # 한국어 또는 영어 문자
+
 class PDFProcessingError(Exception):
     """PDF 처리 관련 오류"""
     pass
@@ -92,8 +96,8 @@ class PDFProcessingService:
     def _clean_extracted_text(self, text: str) -> str:
         """추출된 텍스트 정리"""
         # 불필요한 공백과 줄바꿈 제거
-        text = re.sub(r'\n+', '\n', text)  # 연속된 줄바꿈을 하나로
-        text = re.sub(r'[ \t]+', ' ', text)  # 연속된 공백을 하나로
+        text = _NEWLINES_RE.sub('\n', text)  # 연속된 줄바꿈을 하나로
+        text = _SPACES_RE.sub(' ', text)  # 연속된 공백을 하나로
         text = text.strip()
 
         # 특수 문자나 인코딩 문제 해결
@@ -105,15 +109,14 @@ class PDFProcessingService:
         """교육 콘텐츠로서의 적합성 검증"""
         try:
             # 기본 검증: 한국어 또는 영어 콘텐츠 확인
-            korean_chars = len(re.findall(r'[가-힣]', text))
-            english_chars = len(re.findall(r'[a-zA-Z]', text))
+            readable_chars = len(_READABLE_CHAR_RE.findall(text))
             total_chars = len(text)
 
             if total_chars == 0:
                 return False
 
             # 한국어나 영어가 전체의 30% 이상이면 유효한 콘텐츠로 판단
-            readable_ratio = (korean_chars + english_chars) / total_chars
+            readable_ratio = readable_chars / total_chars
             if readable_ratio < 0.3:
                 raise InvalidPDFContentError("읽을 수 있는 텍스트 내용이 부족합니다.")
 
@@ -80,11 +80,13 @@ class SessionService:
         # Get sessions from database
         db_sessions = await self.db_service.get_sessions_by_teacher(teacher_fingerprint)
 
+        # Live stats (including student counts) for every session in one query
+        all_live_stats = await self.db_service._calculate_live_stats_for_sessions(
+            [db_session.id for db_session in db_sessions]
+        )
+
         teacher_sessions = []
         for db_session in db_sessions:
-            # Get student count
-            students = await self.db_service.get_students_by_session(db_session.id)
-
             # Calculate duration
             created_at = db_session.created_at
             if created_at.tzinfo is None:
@@ -94,8 +96,7 @@ class SessionService:
 
             duration_minutes = int((current_korea_time - created_at).total_seconds() / 60)
 
-            # Get live stats
-            live_stats = await self.db_service._calculate_live_stats(db_session.id)
+            live_stats = all_live_stats[db_session.id]
 
             session_dict = {
                 'id': db_session.id,
@@ -115,7 +116,7 @@ class SessionService:
                 'last_activity': db_session.last_activity.isoformat() if db_session.last_activity else db_session.created_at.isoformat(),
                 'ended_at': db_session.ended_at.isoformat() if db_session.ended_at else None,
                 'deleted_at': None,
-                'students_count': len(students),
+                'students_count': live_stats['total_joined'],
                 'duration_minutes': max(0, duration_minutes),
                 'students': {},
                 'live_stats': live_stats,
@@ -163,10 +164,11 @@ class SessionService:
                 'max_students': db_session.max_students
             },
             'status': db_session.status,
-            'created_at': db_session.created_at.isoformat(),
-            'expires_at': db_session.expires_at.isoformat(),
-            'last_activity': db_session.last_activity.isoformat() if db_session.last_activity else db_session.created_at.isoformat(),
-            'ended_at': db_session.ended_at.isoformat() if db_session.ended_at else None,
+            # Datetimes stay native: the response model serializes them
+            'created_at': db_session.created_at,
+            'expires_at': db_session.expires_at,
+            'last_activity': db_session.last_activity or db_session.created_at,
+            'ended_at': db_session.ended_at,
             'duration_minutes': max(0, duration_minutes),
             'live_stats': live_stats
         }
@@ -174,7 +176,7 @@ class SessionService:
         # Calculate student progress
         students = []
         for db_student in db_students:
-            progress = await self._calculate_student_progress(db_student)
+            progress = await self._calculate_student_progress(db_student, current_korea_time)
             students.append(progress)
 
         print(f"🔍 Session {session_id} has {len(students)} students")
@@ -212,7 +214,7 @@ class SessionService:
             return {
                 'student_id': existing_student.id,
                 'student_token': existing_student.token,
-                'session_config': SessionConfig(
+                'session_config': SessionConfig.model_construct(  # trusted: built from our own DB row, skip validation
                     title=db_session.title,
                     topic=db_session.topic,
                     description=db_session.description,
@@ -245,7 +247,7 @@ class SessionService:
         return {
             'student_id': student_id,
             'student_token': new_student_token,
-            'session_config': SessionConfig(
+            'session_config': SessionConfig.model_construct(  # trusted: built from our own DB row, skip validation
                 title=db_session.title,
                 topic=db_session.topic,
                 description=db_session.description,
@@ -307,9 +309,8 @@ class SessionService:
         # For now, we'll skip this as it requires querying all sessions
         print("🔄 Cleanup expired sessions - skipped (not critical for DB-only architecture)")
 
-    async def _calculate_student_progress(self, student: Student) -> Dict[str, Any]:
-        """Calculate student progress for display"""
-        now = self.get_korea_time()
+    async def _calculate_student_progress(self, student: Student, now: datetime) -> Dict[str, Any]:
+        """Calculate student progress for display, relative to the caller's snapshot time"""
 
         # Parse timestamps
         joined_at = student.joined_at
@@ -333,9 +334,9 @@ class SessionService:
                         student.engagement_score) / 5.0
         progress_percentage = min(100, int(avg_dimension))
 
-        # Get last message
-        messages = await self.db_service.get_student_messages(student.session_id, student.id)
-        last_message = messages[0]['content'] if messages else None
+        # Get last message (only the final conversation entry is read)
+        messages = await self.db_service.get_student_messages(student.session_id, student.id, limit=1)
+        last_message = messages[-1]['content'] if messages else None
 
         return {
             'student_id': student.id,
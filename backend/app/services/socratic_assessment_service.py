@@ -5,13 +5,125 @@
 사고의 질적 변화를 5차원으로 평가합니다.
 """
 
-import json
+import logging
+from bisect import bisect_right
+from collections import OrderedDict
 from typing import Dict, List, Any
 
+import orjson
 from openai import AsyncOpenAI
 
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
+
+# 5차원 평가 가중치 (총합 100%)
+DIMENSION_WEIGHTS = {
+    "depth": 0.25,        # 사고 깊이
+    "breadth": 0.20,      # 사고 확장
+    "application": 0.20,  # 실생활 적용
+    "metacognition": 0.20,# 메타인지
+    "engagement": 0.15    # 소크라테스적 참여
+}
+
+# 난이도별 완성 기준
+DIFFICULTY_CRITERIA = {
+    "easy": {
+        "target_depth": 60,
+        "target_breadth": 50,
+        "target_application": 70,
+        "target_metacognition": 40,
+        "target_engagement": 50
+    },
+    "normal": {
+        "target_depth": 75,
+        "target_breadth": 70,
+        "target_application": 75,
+        "target_metacognition": 60,
+        "target_engagement": 70
+    },
+    "hard": {
+        "target_depth": 85,
+        "target_breadth": 80,
+        "target_application": 80,
+        "target_metacognition": 80,
+        "target_engagement": 85
+    }
+}
+
+# 평균 점수 구간별 피드백: 40 미만, 40 이상, 60 이상, 80 이상
+_FEEDBACK_THRESHOLDS = (40, 60, 80)
+_FEEDBACK_MESSAGES = (
+    "🌱 함께 탐구의 여정을 시작해봅시다!",
+    "💡 좋은 진전을 보이고 있습니다!",
+    "🧠 사고가 깊어지고 확장되고 있어요!",
+    "🌟 탁월한 소크라테스적 사고를 보여주고 있습니다!",
+)
+
+# 평가 응답 LRU 캐시: (모델, user 프롬프트) -> 원본 JSON 응답
+_EVALUATION_CACHE_SIZE = 1024
+_evaluation_cache: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+
+
+def _remember_evaluation(key: tuple[str, str], response_content: str) -> None:
+    """파싱에 성공한 평가 응답을 캐시에 저장하고 오래된 항목을 제거"""
+    _evaluation_cache[key] = response_content
+    _evaluation_cache.move_to_end(key)
+    if len(_evaluation_cache) > _EVALUATION_CACHE_SIZE:
+        _evaluation_cache.popitem(last=False)
+
+# 5차원 평가 지침 (system 메시지)
+_SYSTEM_PROMPT = """당신은 소크라테스식 5차원 평가 전문가입니다.
+
+**평가 원칙**:
+- 학생의 최신 답변만이 아니라, 전체 대화 과정을 통해 나타난 학습자의 누적된 이해도와 성장을 종합적으로 평가하세요
+- 대화가 진행될수록 점수는 점진적으로 상승해야 합니다
+- 한 번 달성한 이해도는 쉽게 후퇴하지 않습니다
+- 급격한 점수 변동보다는 안정적인 성장을 반영하세요
+- 학습자의 전반적인 발전 궤도를 고려하세요
+
+**5차원 평가 기준**:
+1. 사고 깊이 (0-100): 표면적 → 본질적 이해 (누적적 평가)
+2. 사고 확장 (0-100): 단일 → 다각적 관점 (누적적 평가)
+3. 실생활 적용 (0-100): 추상적 → 구체적 연결 (누적적 평가)
+4. 메타인지 (0-100): 사고 과정 인식 (누적적 평가)
+5. 소크라테스적 참여 (0-100): 수동적 → 능동적 탐구 (누적적 평가)
+
+**응답 형식**:
+반드시 아래 JSON 형식으로만 응답하세요:
+
+{
+    "dimensions": {
+        "depth": 점수,
+        "breadth": 점수,
+        "application": 점수,
+        "metacognition": 점수,
+        "engagement": 점수
+    },
+    "insights": {
+        "depth": "깊이 평가 설명",
+        "breadth": "확장 평가 설명",
+        "application": "적용 평가 설명",
+        "metacognition": "메타인지 평가 설명",
+        "engagement": "참여 평가 설명"
+    },
+    "growth_indicators": ["성장지표1", "성장지표2"],
+    "next_focus": "다음 학습 방향 제안"
+}"""
+
+# 대화 히스토리 (user 메시지) - 호출마다 format_map으로 채움
+_USER_PROMPT_TEMPLATE = """주제: {topic}
+난이도: {difficulty}
+대화 턴: {turn_count}회
+
+전체 대화 과정:
+{conversation_summary}
+
+학생의 최신 답변: "{student_response}"
+
+위 대화를 종합적으로 분석하여 5차원 평가를 수행해주세요."""
+
+
 class SocraticAssessmentService:
     def __init__(self):
         settings = get_settings()
@@ -19,40 +131,6 @@ class SocraticAssessmentService:
             raise ValueError("OPENAI_API_KEY is not configured")
         self.client = AsyncOpenAI(api_key=settings.openai_api_key)
         self.model = settings.openai_model
-        
-        # 5차원 평가 가중치 (총합 100%)
-        self.dimension_weights = {
-            "depth": 0.25,        # 사고 깊이
-            "breadth": 0.20,      # 사고 확장
-            "application": 0.20,  # 실생활 적용
-            "metacognition": 0.20,# 메타인지
-            "engagement": 0.15    # 소크라테스적 참여
-        }
-        
-        # 난이도별 완성 기준
-        self.difficulty_criteria = {
-            "easy": {
-                "target_depth": 60,
-                "target_breadth": 50,
-                "target_application": 70,
-                "target_metacognition": 40,
-                "target_engagement": 50
-            },
-            "normal": {
-                "target_depth": 75,
-                "target_breadth": 70,
-                "target_application": 75,
-                "target_metacognition": 60,
-                "target_engagement": 70
-            },
-            "hard": {
-                "target_depth": 85,
-                "target_breadth": 80,
-                "target_application": 80,
-                "target_metacognition": 80,
-                "target_engagement": 85
-            }
-        }
 
     async def evaluate_socratic_dimensions(
         self, 
@@ -75,22 +153,30 @@ class SocraticAssessmentService:
         )
 
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=800
-            )
-            
-            # AI 응답 내용 확인
-            response_content = response.choices[0].message.content.strip()
-            print(f"🤖 AI 평가 응답 원본: {response_content[:200]}...")
+            # 같은 대화 상태(주제, 난이도, 대화 요약, 최신 답변)는 캐시된 평가를 재사용
+            cache_key = (self.model, user_prompt)
+            response_content = _evaluation_cache.get(cache_key)
+            if response_content is not None:
+                _evaluation_cache.move_to_end(cache_key)
+                logger.debug("♻️ 캐시된 평가 응답 사용")
+            else:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=800,
+                    response_format={"type": "json_object"}
+                )
+
+                # AI 응답 내용 확인
+                response_content = response.choices[0].message.content.strip()
+                logger.debug("🤖 AI 평가 응답 원본: %.200s...", response_content)
             
             # JSON 응답 파싱
-            evaluation_result = json.loads(response_content)
+            evaluation_result = orjson.loads(response_content)
             
             # 종합 점수 계산
             overall_score = self._calculate_weighted_score(evaluation_result["dimensions"])
@@ -100,9 +186,9 @@ class SocraticAssessmentService:
                 evaluation_result["dimensions"], difficulty
             )
             
-            print(f"✅ 5차원 평가 완료 - 종합점수: {overall_score}")
+            logger.debug("✅ 5차원 평가 완료 - 종합점수: %s", overall_score)
             
-            return {
+            result = {
                 "dimensions": evaluation_result["dimensions"],
                 "overall_score": overall_score,
                 "is_completed": is_completed,
@@ -110,13 +196,15 @@ class SocraticAssessmentService:
                 "growth_indicators": evaluation_result["growth_indicators"],
                 "next_focus": evaluation_result["next_focus"]
             }
+            _remember_evaluation(cache_key, response_content)
+            return result
             
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON 파싱 오류: {e}")
-            print(f"🔍 AI 응답 내용: {response.choices[0].message.content}")
+        except orjson.JSONDecodeError as e:
+            logger.error("❌ JSON 파싱 오류: %s", e)
+            logger.debug("🔍 AI 응답 내용: %s", response_content)
             return self._get_default_evaluation()
         except Exception as e:
-            print(f"❌ 평가 오류: {e}")
+            logger.error("❌ 평가 오류: %s", e)
             return self._get_default_evaluation()
 
     def _analyze_conversation_context(self, conversation_history: List[Dict]) -> Dict:
@@ -129,12 +217,12 @@ class SocraticAssessmentService:
                 "full_conversation": []
             }
 
-        # 대화 턴 수
-        turn_count = len([msg for msg in conversation_history if msg.get("role") == "user"])
-
         # 질문의 진화 패턴
         user_messages = [msg["content"] for msg in conversation_history if msg.get("role") == "user"]
 
+        # 대화 턴 수
+        turn_count = len(user_messages)
+
         # 개념 이해의 진행 과정
         concept_progression = self._extract_concept_progression(user_messages)
 
@@ -165,19 +253,20 @@ class SocraticAssessmentService:
 
         for msg in conversation_history:
             role = msg.get("role", "")
+            if role not in ("assistant", "user"):
+                continue
+
             content = msg.get("content", "")
+            truncated_content = content[:200] + "..." if len(content) > 200 else content
 
             if role == "assistant":
                 # AI의 소크라테스식 질문
-                truncated_content = content[:200] + "..." if len(content) > 200 else content
                 turn_number += 1
                 summary_parts.append(f"\n[턴 {turn_number} - AI 질문]")
-                summary_parts.append(f"{truncated_content}")
-            elif role == "user":
+            else:
                 # 학생의 답변
-                truncated_content = content[:200] + "..." if len(content) > 200 else content
                 summary_parts.append(f"\n[턴 {turn_number} - 학생 답변]")
-                summary_parts.append(f"{truncated_content}")
+            summary_parts.append(truncated_content)
 
         return "\n".join(summary_parts)
 
@@ -191,76 +280,33 @@ class SocraticAssessmentService:
     ) -> tuple[str, str]:
         """5차원 평가를 위한 프롬프트 생성 (system 지침, user 대화 히스토리)"""
 
-        criteria = self.difficulty_criteria[difficulty]
-
         # 전체 대화 내용(AI 질문 + 학생 답변)을 맥락으로 포함
         conversation_summary = self._build_conversation_summary(context.get('full_conversation', []))
 
-        # System 메시지: 평가 지침
-        system_prompt = """당신은 소크라테스식 5차원 평가 전문가입니다.
-
-**평가 원칙**:
-- 학생의 최신 답변만이 아니라, 전체 대화 과정을 통해 나타난 학습자의 누적된 이해도와 성장을 종합적으로 평가하세요
-- 대화가 진행될수록 점수는 점진적으로 상승해야 합니다
-- 한 번 달성한 이해도는 쉽게 후퇴하지 않습니다
-- 급격한 점수 변동보다는 안정적인 성장을 반영하세요
-- 학습자의 전반적인 발전 궤도를 고려하세요
-
-**5차원 평가 기준**:
-1. 사고 깊이 (0-100): 표면적 → 본질적 이해 (누적적 평가)
-2. 사고 확장 (0-100): 단일 → 다각적 관점 (누적적 평가)
-3. 실생활 적용 (0-100): 추상적 → 구체적 연결 (누적적 평가)
-4. 메타인지 (0-100): 사고 과정 인식 (누적적 평가)
-5. 소크라테스적 참여 (0-100): 수동적 → 능동적 탐구 (누적적 평가)
-
-**응답 형식**:
-반드시 아래 JSON 형식으로만 응답하세요:
-
-{
-    "dimensions": {
-        "depth": 점수,
-        "breadth": 점수,
-        "application": 점수,
-        "metacognition": 점수,
-        "engagement": 점수
-    },
-    "insights": {
-        "depth": "깊이 평가 설명",
-        "breadth": "확장 평가 설명",
-        "application": "적용 평가 설명",
-        "metacognition": "메타인지 평가 설명",
-        "engagement": "참여 평가 설명"
-    },
-    "growth_indicators": ["성장지표1", "성장지표2"],
-    "next_focus": "다음 학습 방향 제안"
-}"""
 
         # User 메시지: 대화 히스토리
-        user_prompt = f"""주제: {topic}
-난이도: {difficulty}
-대화 턴: {context['turn_count']}회
-
-전체 대화 과정:
-{conversation_summary}
+        user_prompt = _USER_PROMPT_TEMPLATE.format_map({
+            "topic": topic,
+            "difficulty": difficulty,
+            "turn_count": context['turn_count'],
+            "conversation_summary": conversation_summary,
+            "student_response": student_response,
+        })
 
-학생의 최신 답변: "{student_response}"
-
-위 대화를 종합적으로 분석하여 5차원 평가를 수행해주세요."""
-
-        return system_prompt, user_prompt
+        return _SYSTEM_PROMPT, user_prompt
 
     def _calculate_weighted_score(self, dimensions: Dict[str, int]) -> int:
         """가중치를 적용한 종합 점수 계산"""
         total_score = 0
         for dimension, score in dimensions.items():
-            weight = self.dimension_weights.get(dimension, 0)
+            weight = DIMENSION_WEIGHTS.get(dimension, 0)
             total_score += score * weight
         
         return int(total_score)
 
     def _check_completion_criteria(self, dimensions: Dict[str, int], difficulty: str) -> bool:
         """완성 기준 체크"""
-        criteria = self.difficulty_criteria[difficulty]
+        criteria = DIFFICULTY_CRITERIA[difficulty]
         
         return (
             dimensions.get("depth", 0) >= criteria["target_depth"] and
@@ -296,16 +342,14 @@ class SocraticAssessmentService:
     def get_dimension_feedback(self, dimensions: Dict[str, int]) -> str:
         """차원별 피드백 메시지 생성"""
         total = sum(dimensions.values()) / len(dimensions)
-        
-        if total >= 80:
-            return "🌟 탁월한 소크라테스적 사고를 보여주고 있습니다!"
-        elif total >= 60:
-            return "🧠 사고가 깊어지고 확장되고 있어요!"
-        elif total >= 40:
-            return "💡 좋은 진전을 보이고 있습니다!"
-        else:
-            return "🌱 함께 탐구의 여정을 시작해봅시다!"
-
-# 서비스 인스턴스 생성 함수
-def get_socratic_assessment_service():
-    return SocraticAssessmentService()
+        return _FEEDBACK_MESSAGES[bisect_right(_FEEDBACK_THRESHOLDS, total)]
+
+# 서비스 인스턴스 생성
+_socratic_assessment_service = None
+
+def get_socratic_assessment_service() -> SocraticAssessmentService:
+    """평가 서비스 인스턴스 반환 (AsyncOpenAI 클라이언트와 연결 풀을 요청 간 공유)"""
+    global _socratic_assessment_service
+    if _socratic_assessment_service is None:
+        _socratic_assessment_service = SocraticAssessmentService()
+    return _socratic_assessment_service
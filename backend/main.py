@@ -3,7 +3,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.socratic_chat import router as chat_router
@@ -21,7 +21,8 @@ settings = get_settings()
 app = FastAPI(
     title="Socratic Tutor API",
     description="Socratic Method AI Learning System",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 allow_origin_regex = settings.allow_origin_regex